@@ -1,15 +1,44 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+
+from src.api.routes import composite, mongodb, neo4j, pgvector, postgres, redis
+from src.db.mongodb_client import mongo_client
+from src.db.neo4j_client import neo4j_client
+from src.db.postgres_client import db as pg_db
+from src.db.redis_client import redis_client
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    # Route handlers stay sync: the drivers are blocking, so FastAPI runs them in its threadpool
+    # where they share the pooled clients below. Open the Postgres pool before serving traffic.
+    _ = pg_db.pool
+    yield
+    pg_db.close()
+    mongo_client.close()
+    neo4j_client.close()
+    redis_client.close()
 
-from src.api.routes import mongodb, neo4j, pgvector, postgres, redis
 
 app = FastAPI(
     title="ArtisanMarket API",
     description="Demonstrating a polyglot persistence architecture.",
     version="1.0.0",
+    # jsonable_encoder still runs first (Decimal, datetime); orjson then does the byte encoding
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
+# List endpoints repeat the same field names per row, so they compress very well
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 app.include_router(postgres.router)
 app.include_router(mongodb.router)
 app.include_router(redis.router)
 app.include_router(neo4j.router)
 app.include_router(pgvector.router)
+app.include_router(composite.router)
@@ -0,0 +1,34 @@
+import asyncio
+
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+
+from src.db.mongodb_client import mongo_client
+from src.db.neo4j_client import neo4j_client
+from src.services.search_service import semantic_search_service
+
+router = APIRouter(
+    tags=["Composite"],
+)
+
+
+@router.get("/products/{product_id}/detail")
+async def get_product_detail(product_id: str):
+    """
+    Fetches similar products, also-bought products, reviews and specs for a product in one call.
+    The four lookups hit different stores, so they run concurrently in the threadpool and the
+    response waits only for the slowest one.
+    """
+    similar_products, also_bought, reviews, specs = await asyncio.gather(
+        run_in_threadpool(semantic_search_service.find_similar_products, product_id, 5),
+        run_in_threadpool(neo4j_client.get_also_bought_products, product_id, 5),
+        run_in_threadpool(mongo_client.get_reviews, product_id),
+        run_in_threadpool(mongo_client.get_specs, product_id),
+    )
+    return {
+        "product_id": product_id,
+        "similar_products": similar_products,
+        "also_bought": also_bought,
+        "reviews": reviews,
+        "specs": specs,
+    }
@@ -1,4 +1,10 @@
-from fastapi import APIRouter, HTTPException
+from collections.abc import Iterable, Iterator
+from itertools import batched
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 
 from src.db.mongodb_client import mongo_client
 
@@ -6,13 +12,32 @@ router = APIRouter(
     tags=["MongoDB"],
 )
 
+_DOCUMENTS_ADAPTER = TypeAdapter(list[dict[str, Any]])
+_STREAM_BATCH_SIZE = 500
+
+
+def _stream_json_array(documents: Iterable[dict[str, Any]]) -> Iterator[bytes]:
+    """Yield documents as one JSON array, serializing a cursor batch at a time."""
+    yield b"["
+    separator = b""
+    for batch in batched(documents, _STREAM_BATCH_SIZE):
+        # dump_json(list) gives "[a,b,...]"; strip the brackets to splice batches together
+        yield separator + _DOCUMENTS_ADAPTER.dump_json(list(batch))[1:-1]
+        separator = b","
+    yield b"]"
+
+
+def _stream_collection(name: str) -> StreamingResponse:
+    cursor = mongo_client.get_collection(name).find({}, {'_id': 0}).batch_size(_STREAM_BATCH_SIZE)
+    return StreamingResponse(_stream_json_array(cursor), media_type="application/json")
+
 
 @router.get("/products/{product_id}/reviews")
 def get_product_reviews(product_id: str):
     """
     Fetches all reviews for a specific product from MongoDB.
     """
-    reviews = list(mongo_client.get_collection("reviews").find({"product_id": product_id}, {'_id': 0}))
+    reviews = mongo_client.get_reviews(product_id)
     if not reviews:
         return {"message": "No reviews found for this product."}
     return reviews
@@ -23,21 +48,31 @@ def get_product_specs(product_id: str):
     """
     Fetches the detailed specifications for a product from MongoDB.
     """
-    specs = mongo_client.get_collection("product_specs").find_one({"product_id": product_id}, {'_id': 0})
+    specs = mongo_client.get_specs(product_id)
     if not specs:
         raise HTTPException(status_code=404, detail="Specifications not found for this product.")
     return specs
 
 
+@router.get("/products/specs")
+def get_product_specs_batch(ids: str = Query(..., description="Comma-separated product IDs")):
+    """
+    Fetches specifications for several products from MongoDB in a single query.
+    Products without specifications are omitted from the result.
+    """
+    product_ids = [product_id.strip() for product_id in ids.split(",") if product_id.strip()]
+    if not product_ids:
+        raise HTTPException(status_code=400, detail="At least one product ID is required.")
+    return mongo_client.get_specs_batch(product_ids)
+
+
 @router.get("/seller_profiles")
 def get_seller_profiles():
-    """Fetches all seller profiles from MongoDB."""
-    profiles = mongo_client.get_collection("seller_profiles").find({}, {'_id': 0})
-    return list(profiles)
+    """Streams all seller profiles from MongoDB as a JSON array."""
+    return _stream_collection("seller_profiles")
 
 
 @router.get("/user_preferences")
 def get_user_preferences():
-    """Fetches all user preferences from MongoDB."""
-    profiles = mongo_client.get_collection("user_preferences").find({}, {'_id': 0})
-    return list(profiles)
+    """Streams all user preferences from MongoDB as a JSON array."""
+    return _stream_collection("user_preferences")
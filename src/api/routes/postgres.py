@@ -1,11 +1,37 @@
-from fastapi import APIRouter, HTTPException
+import orjson
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.encoders import jsonable_encoder
 
+from src.config import REFERENCE_DATA_TTL
 from src.db.postgres_client import db as pg_db
+from src.utils.memo import ttl_memo
 
 router = APIRouter(
     tags=["PostgreSQL"],
 )
 
+_USER_SQL = "SELECT id, name, email, join_date FROM users WHERE id = $1"
+
+_USER_ORDERS_SQL = """
+SELECT json_agg(t ORDER BY t.order_date DESC)::text AS orders
+FROM (
+    SELECT o.id, o.order_date, o.status, o.total_price,
+           json_agg(json_build_object(
+               'product_id', oi.product_id,
+               'quantity', oi.quantity,
+               'price', oi.price_at_purchase
+           )) as items
+    FROM orders o
+    JOIN order_items oi ON o.id = oi.order_id
+    WHERE o.user_id = $1
+    GROUP BY o.id
+) t
+"""
+
+_CATEGORIES_SQL = "SELECT id, name, description FROM categories ORDER BY name"
+
+_SELLERS_SQL = "SELECT id, name, rating, joined FROM sellers ORDER BY name"
+
 
 @router.get("/users/{user_id}")
 def get_user(user_id: str):
@@ -13,7 +39,7 @@ def get_user(user_id: str):
     Fetches a user by their ID from PostgreSQL.
     """
     with pg_db.get_cursor() as cursor:
-        cursor.execute("SELECT id, name, email, join_date FROM users WHERE id = %s", (user_id,))
+        pg_db.execute_prepared(cursor, "get_user", _USER_SQL, (user_id,))
         user = cursor.fetchone()
 
     if not user:
@@ -21,43 +47,44 @@ def get_user(user_id: str):
     return user
 
 
+@ttl_memo(REFERENCE_DATA_TTL)
+def _reference_data_payload(query: str) -> bytes:
+    """Serialized rows of a small, rarely-changing lookup table."""
+    with pg_db.get_cursor() as cursor:
+        cursor.execute(query)
+        rows = cursor.fetchall()
+    return orjson.dumps(jsonable_encoder(rows))
+
+
+def _reference_data_response(query: str) -> Response:
+    return Response(
+        content=_reference_data_payload(query),
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={REFERENCE_DATA_TTL}"},
+    )
+
+
 @router.get("/categories")
 def get_all_categories():
     """Fetches all product categories from PostgreSQL."""
-    with pg_db.get_cursor() as cursor:
-        cursor.execute("SELECT id, name, description FROM categories ORDER BY name")
-        categories = cursor.fetchall()
-    return categories
+    return _reference_data_response(_CATEGORIES_SQL)
 
 
 @router.get("/sellers")
 def get_all_sellers():
     """Fetches all sellers from PostgreSQL."""
-    with pg_db.get_cursor() as cursor:
-        cursor.execute("SELECT id, name, rating, joined FROM sellers ORDER BY name")
-        sellers = cursor.fetchall()
-    return sellers
+    return _reference_data_response(_SELLERS_SQL)
 
 
 @router.get("/users/{user_id}/orders")
 def get_user_orders(user_id: str):
-    """Fetches all orders and their items for a specific user from PostgreSQL."""
+    """
+    Fetches all orders and their items for a specific user from PostgreSQL.
+    The response body is built as JSON text by PostgreSQL and passed through unparsed.
+    """
     with pg_db.get_cursor() as cursor:
-        query = """
-        SELECT o.id, o.order_date, o.status, o.total_price,
-               json_agg(json_build_object(
-                   'product_id', oi.product_id,
-                   'quantity', oi.quantity,
-                   'price', oi.price_at_purchase
-               )) as items
-        FROM orders o
-        JOIN order_items oi ON o.id = oi.order_id
-        WHERE o.user_id = %s
-        GROUP BY o.id
-        ORDER BY o.order_date DESC;
-        """
-        cursor.execute(query, (user_id,))
-        orders = cursor.fetchall()
+        pg_db.execute_prepared(cursor, "get_user_orders", _USER_ORDERS_SQL, (user_id,))
+        orders = cursor.fetchone()["orders"]
     if not orders:
         return {"message": "No orders found for this user."}
-    return orders
+    return Response(content=orders, media_type="application/json")
@@ -1,14 +1,26 @@
-from fastapi import APIRouter, HTTPException, Query
+from typing import Annotated
 
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from pydantic import TypeAdapter
+
+from src.api.dependencies import json_body, json_body_openapi
 from src.api.models import CartItem, CartItemUpdate
+from src.config import HOT_PRODUCTS_MEMO_TTL
 from src.db.redis_client import redis_client
 from src.services import product_service
 from src.services.cart_service import cart_service
+from src.utils.memo import ttl_memo
 
 router = APIRouter(
     tags=["Redis"],
 )
 
+_CART_ITEM_ADAPTER = TypeAdapter(CartItem)
+_CART_ITEM_UPDATE_ADAPTER = TypeAdapter(CartItemUpdate)
+_cart_item_body = json_body(_CART_ITEM_ADAPTER)
+_cart_item_update_body = json_body(_CART_ITEM_UPDATE_ADAPTER)
+
 
 @router.get("/products/{product_id}/cached")
 def get_product_from_cache(product_id: str, user_id: str | None = Query(None)):
@@ -16,30 +28,28 @@ def get_product_from_cache(product_id: str, user_id: str | None = Query(None)):
     Fetches a product, demonstrating caching with Redis.
     """
     # Using the dedicated product service which has caching built-in
-    product = product_service.get_product_by_id(product_id, user_id=user_id)
+    product, cache_hit = product_service.get_product_by_id(product_id, user_id=user_id)
 
     if not product:
         raise HTTPException(status_code=404, detail="Product not found.")
 
-    # We need a way to know if it was a cache hit. The service prints it.
-    # For an API, the service should return this info. Let's simulate it.
-    cache_key = f"product:{product_id}"
-    if redis_client.client.exists(cache_key):
-        product['cache_status'] = 'HIT'
-    else:
-        product['cache_status'] = 'MISS'
-
+    product['cache_status'] = 'HIT' if cache_hit else 'MISS'
     return product
 
 
+@ttl_memo(HOT_PRODUCTS_MEMO_TTL)
+def _hot_products_payload(top_n: int) -> bytes:
+    """Serialized hot-products response, shared by all requests within the memo window."""
+    return orjson.dumps({"hot_products": redis_client.get_hot_products(top_n=top_n)})
+
+
 @router.get("/products/hot")
 def get_hot_products():
     """
     Gets the top 10 'hot products' from a Redis Sorted Set.
-    The score is incremented on each product view.
+    The score is incremented on each product view; the leaderboard is reused for up to a second.
     """
-    hot_products = redis_client.get_hot_products(top_n=10)
-    return {"hot_products": hot_products}
+    return Response(content=_hot_products_payload(10), media_type="application/json")
 
 
 @router.get("/cache-metrics")
@@ -51,8 +61,8 @@ def get_cache_metrics():
     return redis_client.get_cache_metrics()
 
 
-@router.post("/cart/{user_id}")
-def add_item_to_cart(user_id: str, item: CartItem):
+@router.post("/cart/{user_id}", openapi_extra=json_body_openapi(CartItem))
+def add_item_to_cart(user_id: str, item: Annotated[CartItem, Depends(_cart_item_body)]):
     """Adds a product to the user's shopping cart (stored in a Redis Hash)."""
     try:
         cart_service.add_to_cart(user_id, item.product_id, item.quantity)
@@ -61,8 +71,10 @@ def add_item_to_cart(user_id: str, item: CartItem):
         raise HTTPException(status_code=400, detail=str(e)) from e
 
 
-@router.put("/cart/{user_id}/items/{product_id}")
-def update_cart_item_quantity(user_id: str, product_id: str, item_update: CartItemUpdate):
+@router.put("/cart/{user_id}/items/{product_id}", openapi_extra=json_body_openapi(CartItemUpdate))
+def update_cart_item_quantity(
+    user_id: str, product_id: str, item_update: Annotated[CartItemUpdate, Depends(_cart_item_update_body)]
+):
     """Updates the quantity of a specific item in the cart. A quantity of 0 will remove the item."""
     try:
         cart_service.update_item_quantity(user_id, product_id, item_update.quantity)
@@ -77,6 +89,12 @@ def get_user_cart(user_id: str):
     return cart_service.get_cart(user_id)
 
 
+@router.get("/cart/{user_id}/details")
+def get_user_cart_details(user_id: str):
+    """Retrieves the user's cart with product details and specifications for each item."""
+    return {"user_id": user_id, "items": cart_service.get_cart_details(user_id)}
+
+
 @router.delete("/cart/{user_id}/items/{product_id}")
 def remove_item_from_cart(user_id: str, product_id: str):
     """Removes a specific item from a user's shopping cart in Redis."""
@@ -12,6 +12,8 @@ load_dotenv()
 # Project paths
 BASE_DIR = Path(__file__).parent.parent
 DATA_DIR = BASE_DIR / "raw_data"
+# Parsed DataFrames are pickled here and reused until the source CSV changes
+PARSED_DATA_CACHE_DIR = BASE_DIR / ".cache" / "parsed"
 
 
 class PostgresConfig(TypedDict):
@@ -38,6 +40,7 @@ class Neo4jConfig(TypedDict):
     uri: str
     user: str
     password: str
+    database: str
 
 
 # Database configurations
@@ -49,6 +52,10 @@ POSTGRES_CONFIG: PostgresConfig = {
     "password": os.getenv("POSTGRES_PASSWORD", "password"),
 }
 
+# Connection pool bounds for raw psycopg2 access; defaults to two connections per core
+POSTGRES_POOL_MIN: int = 1
+POSTGRES_POOL_MAX: int = int(os.getenv("POSTGRES_POOL_SIZE", 2 * (os.cpu_count() or 1)))
+
 MONGO_CONFIG: MongoConfig = {
     "uri": os.getenv("MONGO_URI", "mongodb://localhost:27017/"),
     "database": os.getenv("MONGO_DB", "artisan_market"),
@@ -61,15 +68,33 @@ REDIS_CONFIG: RedisConfig = {
     "decode_responses": True,
 }
 
+# Redis connection pool: callers wait up to REDIS_POOL_TIMEOUT seconds for a free connection
+REDIS_POOL_MAX: int = int(os.getenv("REDIS_POOL_SIZE", 2 * (os.cpu_count() or 1)))
+REDIS_POOL_TIMEOUT: int = 5
+REDIS_HEALTH_CHECK_INTERVAL: int = 30
+
 NEO4J_CONFIG: Neo4jConfig = {
     "uri": os.getenv("NEO4J_URI", "bolt://localhost:7687"),
     "user": os.getenv("NEO4J_USER", "neo4j"),
     "password": os.getenv("NEO4J_PASSWORD", "password"),
+    "database": os.getenv("NEO4J_DATABASE", "neo4j"),
 }
 
 # Cache settings
 CACHE_TTL: int = 3600  # 1 hour
+SEARCH_CACHE_TTL: int = 300  # 5 minutes, search results go stale faster than embeddings
 CART_TTL: int = 86400  # 24 hours
+HOT_PRODUCTS_MEMO_TTL: float = 1.0  # seconds the hot-products payload is reused in-process
+REFERENCE_DATA_TTL: int = 60  # seconds categories/sellers lists may be served from memory and client caches
+
+# pgvector HNSW search settings
+HNSW_EF_SEARCH: int = 100
+
+# Embedding model settings, shared by search and the vector loader. "onnx" runs an int8-quantized
+# export through ONNX Runtime (install the "onnx" extra); "torch" is the PyTorch model (FP16 on CUDA).
+EMBEDDING_BACKEND: str = os.getenv("EMBEDDING_BACKEND", "torch")
+EMBEDDING_ONNX_FILE: str = os.getenv("EMBEDDING_ONNX_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+QUERY_EMBEDDING_CACHE_SIZE: int = 4096  # query vectors kept in-process in front of the Redis copy
 
 # Rate limiting
 RATE_LIMIT_REQUESTS: int = 100
@@ -11,10 +11,28 @@ class MongoDBClient:
         self.client = MongoClient(MONGO_CONFIG["uri"])
         self.db: Database = self.client[MONGO_CONFIG["database"]]
 
+    def close(self):
+        self.client.close()
+
     def get_collection(self, name: str):
         """Get a MongoDB collection."""
         return self.db[name]
 
+    def get_reviews(self, product_id: str) -> list[dict]:
+        """Fetch all reviews for a product."""
+        return list(self.get_collection("reviews").find({"product_id": product_id}, {"_id": 0}))
+
+    def get_specs(self, product_id: str) -> dict | None:
+        """Fetch the specifications document for a product."""
+        return self.get_collection("product_specs").find_one({"product_id": product_id}, {"_id": 0})
+
+    def get_specs_batch(self, product_ids: list[str]) -> dict[str, dict]:
+        """Fetch specifications for several products in one query, keyed by product ID."""
+        if not product_ids:
+            return {}
+        cursor = self.get_collection("product_specs").find({"product_id": {"$in": product_ids}}, {"_id": 0})
+        return {spec["product_id"]: spec for spec in cursor}
+
     def create_indexes(self):
         """Create necessary indexes."""
         # reviews collection
@@ -3,22 +3,98 @@
 from datetime import datetime
 from typing import Any
 
-from neo4j import GraphDatabase
+from neo4j import AsyncDriver, AsyncGraphDatabase, GraphDatabase, RoutingControl
 
 from src.config import NEO4J_CONFIG
 
+ADD_VIEW_QUERY = """
+MATCH (u:User {id: $user_id})
+MATCH (p:Product {id: $product_id})
+CREATE (u)-[:VIEWED {timestamp: $timestamp}]->(p)
+"""
+
+ADD_PURCHASE_QUERY = """
+MATCH (u:User {id: $user_id})
+MATCH (p:Product {id: $product_id})
+CREATE (u)-[:PURCHASED {quantity: $quantity, date: $date}]->(p)
+"""
+
+# Bulk variant for generated history: each row carries its own buyer, quantity and date
+ADD_PURCHASE_ROWS_QUERY = """
+UNWIND $rows AS r
+MATCH (u:User {id: r.user_id})
+MATCH (p:Product {id: r.product_id})
+CREATE (u)-[:PURCHASED {quantity: r.quantity, date: r.date}]->(p)
+"""
+
+# One statement per order: the buyer is matched once and each row adds one PURCHASED edge
+ADD_PURCHASES_QUERY = """
+MATCH (u:User {id: $user_id})
+UNWIND $rows AS r
+MATCH (p:Product {id: r.product_id})
+CREATE (u)-[:PURCHASED {quantity: r.quantity, date: $date}]->(p)
+"""
+
+# Collapse each hop to distinct nodes before expanding the next one, so a user with many
+# purchases doesn't multiply out every (product, co-buyer, product) path. Scores count distinct
+# co-buyers, so repeat purchases of the same product by one user don't inflate them.
+RECOMMENDATIONS_QUERY = """
+MATCH (target:User {id: $user_id})-[:PURCHASED]->(p:Product)
+USING INDEX target:User(id)
+WITH target, collect(DISTINCT p) AS bought
+UNWIND bought AS p
+MATCH (p)<-[:PURCHASED]-(other:User)
+WHERE other <> target
+WITH DISTINCT other, bought
+MATCH (other)-[:PURCHASED]->(rec:Product)
+WHERE NOT rec IN bought
+WITH rec, count(DISTINCT other) as frequency
+ORDER BY frequency DESC
+LIMIT $limit
+RETURN rec.id as product_id, rec.name as product_name
+"""
+
+ALSO_BOUGHT_QUERY = """
+MATCH (source:Product {id: $product_id})<-[:PURCHASED]-(u:User)
+USING INDEX source:Product(id)
+WITH DISTINCT source, u
+MATCH (u)-[:PURCHASED]->(other:Product)
+WHERE other <> source
+WITH other, count(DISTINCT u) as purchase_count
+ORDER BY purchase_count DESC
+LIMIT $limit
+RETURN other.id as product_id, other.name as product_name
+"""
+
+FREQUENTLY_BOUGHT_TOGETHER_QUERY = """
+MATCH (u:User)-[:PURCHASED]->(p1:Product),
+      (u)-[:PURCHASED]->(p2:Product)
+WHERE id(p1) < id(p2)
+WITH p1, p2, count(u) AS purchase_count
+ORDER BY purchase_count DESC
+LIMIT $limit
+RETURN p1.id AS product1_id, p1.name AS product1_name,
+       p2.id AS product2_id, p2.name AS product2_name,
+       purchase_count
+"""
+
 
 class Neo4jClient:
     def __init__(self):
         self.driver = GraphDatabase.driver(NEO4J_CONFIG["uri"], auth=(NEO4J_CONFIG["user"], NEO4J_CONFIG["password"]))
-
+        self.database = NEO4J_CONFIG["database"]
 
     def close(self):
         self.driver.close()
 
+    @staticmethod
+    def create_async_driver() -> AsyncDriver:
+        """Create an asyncio driver for the same server; the caller owns and must close it."""
+        return AsyncGraphDatabase.driver(NEO4J_CONFIG["uri"], auth=(NEO4J_CONFIG["user"], NEO4J_CONFIG["password"]))
+
     def create_constraints(self):
         """Create uniqueness and existence constraints."""
-        with self.driver.session() as session:
+        with self.driver.session(database=self.database) as session:
             # Uniqueness constraints (also create indexes)
             session.run("CREATE CONSTRAINT user_id IF NOT EXISTS FOR (u:User) REQUIRE u.id IS UNIQUE")
             session.run("CREATE CONSTRAINT product_id IF NOT EXISTS FOR (p:Product) REQUIRE p.id IS UNIQUE")
@@ -30,88 +106,43 @@ class Neo4jClient:
             session.run("CREATE CONSTRAINT category_name IF NOT EXISTS FOR (c:Category) REQUIRE c.name IS NOT NULL")
             print("Neo4j constraints created.")
 
+    def _execute(self, query: str, routing_: RoutingControl = RoutingControl.WRITE, **params: Any) -> list[dict[str, Any]]:
+        """Run a query through the driver's managed transaction API and return plain dicts.
+
+        execute_query reuses pooled bolt connections and retries transient failures,
+        so short calls don't pay for opening and tearing down a session each time.
+        """
+        records, _, _ = self.driver.execute_query(query, params, database_=self.database, routing_=routing_)
+        return [record.data() for record in records]
+
     def add_view(self, user_id: str, product_id: str):
         """Add a VIEWED relationship."""
-        with self.driver.session() as session:
-            session.run(
-                """
-                MATCH (u:User {id: $user_id})
-                MATCH (p:Product {id: $product_id})
-                CREATE (u)-[:VIEWED {timestamp: $timestamp}]->(p)
-                """,
-                user_id=user_id,
-                product_id=product_id,
-                timestamp=datetime.now().isoformat(),
-            )
+        self._execute(ADD_VIEW_QUERY, user_id=user_id, product_id=product_id, timestamp=datetime.now().isoformat())
 
     def add_purchase(self, user_id: str, product_id: str, quantity: int, date: Any):
         """Add a purchase relationship."""
-        with self.driver.session() as session:
-            session.run(
-                """
-                MATCH (u:User {id: $user_id})
-                MATCH (p:Product {id: $product_id})
-                CREATE (u)-[:PURCHASED {quantity: $quantity, date: $date}]->(p)
-                """,
-                user_id=user_id,
-                product_id=product_id,
-                quantity=quantity,
-                date=date,
-            )
+        self._execute(ADD_PURCHASE_QUERY, user_id=user_id, product_id=product_id, quantity=quantity, date=date)
+
+    def add_purchases(self, user_id: str, items: dict[str, int], date: Any):
+        """Add PURCHASED relationships for every product_id -> quantity in `items` in one round-trip."""
+        rows = [{"product_id": product_id, "quantity": quantity} for product_id, quantity in items.items()]
+        self._execute(ADD_PURCHASES_QUERY, user_id=user_id, rows=rows, date=date)
+
+    def add_purchase_rows(self, rows: list[dict[str, Any]]):
+        """Add one PURCHASED relationship per row (user_id, product_id, quantity, date) in a single query."""
+        self._execute(ADD_PURCHASE_ROWS_QUERY, rows=rows)
 
     def get_recommendations(self, user_id: str, limit: int = 5):
         """Get product recommendations for a user based on collaborative filtering."""
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (target:User {id: $user_id})-[:PURCHASED]->(p:Product)<-[:PURCHASED]-(other:User)
-                MATCH (other)-[:PURCHASED]->(rec:Product)
-                WHERE NOT (target)-[:PURCHASED]->(rec)
-                WITH rec, count(*) as frequency
-                ORDER BY frequency DESC
-                LIMIT $limit
-                RETURN rec.id as product_id, rec.name as product_name
-                """,
-                user_id=user_id,
-                limit=limit,
-            )
-            return [record.data() for record in result]
+        return self._execute(RECOMMENDATIONS_QUERY, RoutingControl.READ, user_id=user_id, limit=limit)
 
     def get_also_bought_products(self, product_id: str, limit: int = 5):
         """Get products that are frequently bought by users who purchased a specific product."""
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (:Product {id: $product_id})<-[:PURCHASED]-(u:User)-[:PURCHASED]->(other:Product)
-                WHERE other.id <> $product_id
-                WITH other, count(u) as purchase_count
-                ORDER BY purchase_count DESC
-                LIMIT $limit
-                RETURN other.id as product_id, other.name as product_name
-                """,
-                product_id=product_id,
-                limit=limit,
-            )
-            return [record.data() for record in result]
+        return self._execute(ALSO_BOUGHT_QUERY, RoutingControl.READ, product_id=product_id, limit=limit)
 
     def get_frequently_bought_together(self, limit: int = 10):
         """Finds pairs of products that are frequently purchased together across all users."""
-        with self.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (u:User)-[:PURCHASED]->(p1:Product),
-                      (u)-[:PURCHASED]->(p2:Product)
-                WHERE id(p1) < id(p2)
-                WITH p1, p2, count(u) AS purchase_count
-                ORDER BY purchase_count DESC
-                LIMIT $limit
-                RETURN p1.id AS product1_id, p1.name AS product1_name,
-                       p2.id AS product2_id, p2.name AS product2_name,
-                       purchase_count
-                """,
-                limit=limit,
-            )
-            return [record.data() for record in result]
+        return self._execute(FREQUENTLY_BOUGHT_TOGETHER_QUERY, RoutingControl.READ, limit=limit)
 
 
 # Singleton instance
@@ -1,17 +1,54 @@
 """PostgreSQL connection and utilities."""
 
+import io
+import threading
 from contextlib import contextmanager
+from functools import cache
+from typing import TYPE_CHECKING, Any
 
 import psycopg2
+import psycopg2.extensions
 from pgvector.psycopg2 import register_vector
 from psycopg2.extras import RealDictCursor
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from psycopg2.pool import ThreadedConnectionPool
 
-from src.config import POSTGRES_CONFIG
+from src.config import HNSW_EF_SEARCH, POSTGRES_CONFIG, POSTGRES_POOL_MAX, POSTGRES_POOL_MIN
 
-Base = declarative_base()
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# SQLAlchemy is only needed by ORM callers; import it on first use so raw-SQL paths skip the cost
+@cache
+def _declarative_base():
+    from sqlalchemy.orm import declarative_base
+
+    return declarative_base()
+
+
+def __getattr__(name: str) -> Any:
+    if name == "Base":
+        return _declarative_base()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# NUMERIC columns (prices, totals) come back as float instead of Decimal, converted in psycopg2's row builder
+DEC2FLOAT = psycopg2.extensions.new_type(
+    psycopg2.extensions.DECIMAL.values,
+    "DEC2FLOAT",
+    lambda value, _cursor: float(value) if value is not None else None,
+)
+
+
+class _PooledConnection(psycopg2.extensions.connection):
+    """psycopg2 connection that remembers whether per-session setup already ran."""
+
+    is_prepared = False
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        # Names of server-side prepared statements created on this session
+        self.prepared_statements: set[str] = set()
 
 
 class PostgresConnection:
@@ -19,10 +56,16 @@ class PostgresConnection:
         self.config = POSTGRES_CONFIG
         self._engine = None
         self._session_factory = None
+        self._pool: ThreadedConnectionPool | None = None
+        self._pool_lock = threading.Lock()
+        # ThreadedConnectionPool raises instead of waiting when exhausted; make callers queue instead
+        self._pool_slots = threading.BoundedSemaphore(POSTGRES_POOL_MAX)
 
     @property
     def engine(self):
         if not self._engine:
+            from sqlalchemy import create_engine
+
             db_url = (
                 f"postgresql://{self.config['user']}:{self.config['password']}@"
                 f"{self.config['host']}:{self.config['port']}/{self.config['database']}"
@@ -33,23 +76,101 @@ class PostgresConnection:
     @property
     def session_factory(self):
         if not self._session_factory:
+            from sqlalchemy.orm import sessionmaker
+
             self._session_factory = sessionmaker(bind=self.engine)
         return self._session_factory
 
-    @contextmanager
-    def get_cursor(self):
-        """Get a database cursor for raw SQL queries."""
-        conn = psycopg2.connect(**self.config)
-        register_vector(conn)
+    @property
+    def pool(self) -> ThreadedConnectionPool:
+        """Lazily created pool shared by all raw-SQL callers."""
+        if not self._pool:
+            with self._pool_lock:
+                if not self._pool:
+                    self._pool = ThreadedConnectionPool(
+                        POSTGRES_POOL_MIN,
+                        POSTGRES_POOL_MAX,
+                        connection_factory=_PooledConnection,
+                        **self.config,
+                    )
+        return self._pool
+
+    def close(self):
+        """Close every pooled connection."""
+        if self._pool:
+            self._pool.closeall()
+            self._pool = None
+
+    @staticmethod
+    def _prepare_connection(conn: _PooledConnection):
+        """Run the per-session setup once, the first time a pooled connection is checked out."""
+        psycopg2.extensions.register_type(DEC2FLOAT, conn)
         try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                yield cursor
-                conn.commit()
-        except Exception as e:
+            register_vector(conn)
+        except psycopg2.ProgrammingError:
+            # The vector extension doesn't exist yet (create_tables on a fresh database); retry next checkout
             conn.rollback()
-            raise e
-        finally:
-            conn.close()
+            return
+        with conn.cursor() as cursor:
+            # Wider HNSW candidate list per query: better recall for a small latency cost
+            cursor.execute("SET hnsw.ef_search = %s", (HNSW_EF_SEARCH,))
+        conn.commit()
+        conn.is_prepared = True
+
+    @staticmethod
+    def execute_prepared(cursor, name: str, query: str, params: tuple = ()):
+        """
+        Execute `query` as a named server-side prepared statement.
+
+        The statement is PREPAREd the first time it runs on a pooled connection, after which
+        only EXECUTE is sent and PostgreSQL skips parsing and planning. `query` must use
+        positional $1, $2, ... placeholders.
+        """
+        conn = cursor.connection
+        if name not in conn.prepared_statements:
+            cursor.execute(f"PREPARE {name} AS {query}")
+            conn.prepared_statements.add(name)
+        if params:
+            cursor.execute(f"EXECUTE {name}({', '.join(['%s'] * len(params))})", params)
+        else:
+            cursor.execute(f"EXECUTE {name}")
+
+    @staticmethod
+    def copy_rows(cursor, table: str, frame: "pd.DataFrame", conflict_columns: str = "id"):
+        """
+        Bulk-load `frame` into `table` with a single COPY.
+
+        Rows are streamed into a temporary staging table first, so the final insert can keep
+        ON CONFLICT (`conflict_columns`) DO NOTHING and reloading stays idempotent.
+        """
+        columns = ", ".join(frame.columns)
+        buffer = io.StringIO()
+        frame.to_csv(buffer, index=False, header=False)
+        buffer.seek(0)
+
+        cursor.execute(f"CREATE TEMP TABLE staging_{table} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP")
+        cursor.copy_expert(f"COPY staging_{table} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM staging_{table} "
+            f"ON CONFLICT ({conflict_columns}) DO NOTHING"
+        )
+
+    @contextmanager
+    def get_cursor(self):
+        """Get a database cursor for raw SQL queries, backed by a pooled connection."""
+        with self._pool_slots:
+            conn = self.pool.getconn()
+            try:
+                if not conn.is_prepared:
+                    self._prepare_connection(conn)
+                with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                    yield cursor
+                    conn.commit()
+            except Exception as e:
+                conn.rollback()
+                raise e
+            finally:
+                self.pool.putconn(conn)
 
     def create_tables(self):
         """Create all tables in the database."""
@@ -92,6 +213,18 @@ class PostgresConnection:
             );
             """,
             """
+            -- to_tsvector with an explicit config is immutable but array_to_string is not, so the
+            -- generated column goes through a wrapper declared IMMUTABLE (true for these inputs)
+            CREATE OR REPLACE FUNCTION product_search_vector(name TEXT, description TEXT, tags TEXT[])
+            RETURNS tsvector LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+                SELECT to_tsvector('english', name || ' ' || description || ' ' || array_to_string(tags, ' '))
+            $$;
+            """,
+            """
+            ALTER TABLE products ADD COLUMN IF NOT EXISTS search_vec tsvector
+            GENERATED ALWAYS AS (product_search_vector(name, description, tags)) STORED;
+            """,
+            """
             CREATE TABLE IF NOT EXISTS orders (
                 id VARCHAR(255) PRIMARY KEY,
                 user_id VARCHAR(255) REFERENCES users(id),
@@ -116,25 +249,38 @@ class PostgresConnection:
             );
             """,
             """
+            CREATE INDEX IF NOT EXISTS idx_categories_name ON categories(name) INCLUDE (id, description);
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_sellers_name ON sellers(name) INCLUDE (id, rating, joined);
+            """,
+            """
             CREATE INDEX IF NOT EXISTS idx_product_category ON products(category_id);
             """,
             """
             CREATE INDEX IF NOT EXISTS idx_product_seller ON products(seller_id);
             """,
             """
+            CREATE INDEX IF NOT EXISTS idx_product_search ON products USING gin(search_vec);
+            """,
+            """
             CREATE INDEX IF NOT EXISTS idx_order_user ON orders(user_id);
             """,
             """
             CREATE INDEX IF NOT EXISTS idx_order_item_product ON order_items(product_id);
             """,
             """
-            CREATE INDEX IF NOT EXISTS idx_embedding_product ON product_embeddings USING hnsw (embedding vector_l2_ops);
+            DROP INDEX IF EXISTS idx_embedding_product; -- legacy L2 index, superseded below
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_embedding_product_cosine ON product_embeddings
+            USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
             """,
         ]
 
+        # One simple-query message for the whole schema; get_cursor commits it as a single transaction
         with self.get_cursor() as cursor:
-            for query in queries:
-                cursor.execute(query)
+            cursor.execute("\n".join(queries))
 
 
 # Singleton instance
@@ -1,58 +1,159 @@
 """Redis connection and utilities."""
 
-import json
+from itertools import batched
 from typing import Any
 
+import orjson
 import redis
 
-from src.config import CACHE_TTL, CART_TTL, REDIS_CONFIG
+from src.config import (
+    CACHE_TTL,
+    CART_TTL,
+    REDIS_CONFIG,
+    REDIS_HEALTH_CHECK_INTERVAL,
+    REDIS_POOL_MAX,
+    REDIS_POOL_TIMEOUT,
+)
+
+# Fixed keys and prefixes are pre-encoded: redis-py sends bytes as-is instead of encoding a str per call.
+# All cache hit/miss counters live as fields of one hash, so reading them is a single HGETALL
+CACHE_METRICS_KEY = b"cache_metrics"
+HOT_PRODUCTS_KEY = b"hot_products"
+CART_KEY_PREFIX = b"cart:"
+
+# Encode NumPy scalars and arrays as plain JSON numbers instead of raising
+_JSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+
+# Cache read plus hit/miss bookkeeping in one server-side call, so a lookup costs a single round-trip.
+# KEYS: cached value, metrics hash. ARGV: hit field, miss field.
+_GET_COUNTED_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+redis.call('HINCRBY', KEYS[2], value and ARGV[1] or ARGV[2], 1)
+return value
+"""
+
+# Cache read that bumps the member's hot-products score only when the value was found.
+# KEYS: cached value, hot-products sorted set. ARGV: member.
+_GET_AND_SCORE_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if value then
+    redis.call('ZINCRBY', KEYS[2], 1, ARGV[1])
+end
+return value
+"""
+
+
+def _create_pool(**overrides: Any) -> redis.BlockingConnectionPool:
+    """Bounded pool that makes callers wait for a connection instead of raising when exhausted."""
+    return redis.BlockingConnectionPool(
+        max_connections=REDIS_POOL_MAX,
+        timeout=REDIS_POOL_TIMEOUT,
+        socket_keepalive=True,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        **{**REDIS_CONFIG, **overrides},
+    )
 
 
 class RedisClient:
     def __init__(self):
-        self.client = redis.Redis(**REDIS_CONFIG)
-
-    def get_json(self, key: str) -> Any | None:
-        """Get JSON data from Redis, handling potential decoding errors."""
-        data = self.client.get(key)
+        # redis-py picks the C hiredis parser automatically when it is installed
+        self.client = redis.Redis(connection_pool=_create_pool())
+        # Same server without response decoding, for binary payloads such as embeddings
+        self.binary_client = redis.Redis(connection_pool=_create_pool(decode_responses=False))
+        # Registered scripts run via EVALSHA and reload themselves after a server restart
+        self._get_counted = self.client.register_script(_GET_COUNTED_SCRIPT)
+        self._get_and_score = self.client.register_script(_GET_AND_SCORE_SCRIPT)
+
+    def close(self):
+        """Disconnect both connection pools."""
+        self.client.connection_pool.disconnect()
+        self.binary_client.connection_pool.disconnect()
+
+    @staticmethod
+    def _decode_json(key: str, data: Any) -> Any | None:
         if not data:
             return None
         try:
-            return json.loads(data)  # type: ignore[arg-type]
-        except json.JSONDecodeError:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
             print(f"Warning: Could not decode JSON for key {key}")
             return None
 
+    def get_json(self, key: str) -> Any | None:
+        """Get JSON data from Redis, handling potential decoding errors."""
+        return self._decode_json(key, self.client.get(key))
+
+    def get_json_counted(self, key: str, hit_metric: str, miss_metric: str) -> Any | None:
+        """Get JSON data and record a cache hit or miss metric in the same round-trip."""
+        return self._decode_json(key, self._get_counted(keys=[key, CACHE_METRICS_KEY], args=[hit_metric, miss_metric]))
+
+    def get_json_scoring_hot(self, key: str, product_id: str) -> Any | None:
+        """Get JSON data and, if it was cached, bump the product's hot score in the same round-trip."""
+        return self._decode_json(key, self._get_and_score(keys=[key, HOT_PRODUCTS_KEY], args=[product_id]))
+
     def set_json(self, key: str, value: Any, ttl: int = CACHE_TTL) -> bool:
         """Set JSON data in Redis with TTL."""
-        return self.client.setex(key, ttl, json.dumps(value))  # type: ignore[return-value]
+        return self.client.setex(key, ttl, orjson.dumps(value, option=_JSON_OPTIONS))  # type: ignore[return-value]
+
+    def get_json_many(self, keys: list[str]) -> list[Any | None]:
+        """Get several JSON values with a single MGET; missing or undecodable keys yield None."""
+        if not keys:
+            return []
+        values = self.client.mget(keys)
+        return [self._decode_json(key, data) for key, data in zip(keys, values, strict=True)]  # type: ignore[arg-type]
+
+    def set_json_many(self, items: dict[str, Any], ttl: int = CACHE_TTL):
+        """Set several JSON values with TTL in one pipelined round-trip."""
+        if not items:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.setex(key, ttl, orjson.dumps(value, option=_JSON_OPTIONS))
+        pipe.execute()
+
+    def get_bytes(self, key: str) -> bytes | None:
+        """Get a raw binary value from Redis."""
+        return self.binary_client.get(key)  # type: ignore[return-value]
+
+    def set_bytes(self, key: str, value: bytes, ttl: int = CACHE_TTL) -> bool:
+        """Set a raw binary value in Redis with TTL."""
+        return self.binary_client.setex(key, ttl, value)  # type: ignore[return-value]
+
+    def delete_pattern(self, pattern: str, batch_size: int = 500) -> int:
+        """Delete all keys matching a glob pattern without blocking the server like KEYS would."""
+        deleted = 0
+        for keys in batched(self.client.scan_iter(pattern, count=batch_size), batch_size):
+            deleted += self.client.unlink(*keys)  # type: ignore[operator]
+        return deleted
 
     def increment_hot_product_score(self, product_id: str, increment_by: int = 1):
         """Increment the score of a product in the hot products sorted set."""
-        hot_products_key = "hot_products"
-        self.client.zincrby(hot_products_key, increment_by, product_id)
+        self.client.zincrby(HOT_PRODUCTS_KEY, increment_by, product_id)
 
     def get_hot_products(self, top_n: int = 10) -> list[tuple[str, float]]:
         """Get the top N hot products with their scores."""
-        hot_products_key = "hot_products"
         # zrevrange with withscores=True and decode_responses=True directly returns list[tuple[str, float]]
-        return self.client.zrevrange(hot_products_key, 0, top_n - 1, withscores=True)  # type: ignore[return-value]
+        return self.client.zrevrange(HOT_PRODUCTS_KEY, 0, top_n - 1, withscores=True)  # type: ignore[return-value]
 
-    def get_cart_key(self, user_id: str) -> str:
+    def get_cart_key(self, user_id: str) -> bytes:
         """Generate the Redis key for a user's cart."""
-        return f"cart:{user_id}"
+        return CART_KEY_PREFIX + user_id.encode()
 
     def add_to_cart(self, user_id: str, product_id: str, quantity: int = 1):
         """Add a product to the user's cart or increment its quantity."""
         cart_key = self.get_cart_key(user_id)
-        self.client.hincrby(cart_key, product_id, quantity)
-        self.client.expire(cart_key, CART_TTL)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hincrby(cart_key, product_id, quantity)
+        pipe.expire(cart_key, CART_TTL)
+        pipe.execute()
 
     def update_cart_item_quantity(self, user_id: str, product_id: str, quantity: int):
         """Set a specific quantity for a product in the cart."""
         cart_key = self.get_cart_key(user_id)
-        self.client.hset(cart_key, product_id, str(quantity))
-        self.client.expire(cart_key, CART_TTL)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hset(cart_key, product_id, str(quantity))
+        pipe.expire(cart_key, CART_TTL)
+        pipe.execute()
 
     def remove_from_cart(self, user_id: str, product_id: str):
         """Remove a product from the user's cart."""
@@ -79,18 +180,12 @@ class RedisClient:
 
     def increment_cache_metric(self, metric_name: str):
         """Increment a cache metric (e.g., 'hits' or 'misses')."""
-        self.client.incr(f"cache_metrics:{metric_name}")
+        self.client.hincrby(CACHE_METRICS_KEY, metric_name, 1)
 
     def get_cache_metrics(self) -> dict[str, int]:
-        """Get all cache metrics like hits and misses by scanning keys."""
-        metrics = {}
-        # Use scan_iter for performance; it avoids blocking the server like KEYS.
-        for key in self.client.scan_iter("cache_metrics:*"):
-            # 'key' is a string because decode_responses=True
-            metric_name = key.split(":", 1)[1]  # Extracts 'hits' from 'cache_metrics:hits'
-            value = self.client.get(key)
-            metrics[metric_name] = int(value) if value else 0  # type: ignore[arg-type]
-        return metrics
+        """Get all cache metrics like hits and misses in one round-trip."""
+        metrics = self.client.hgetall(CACHE_METRICS_KEY)
+        return {name: int(value) for name, value in metrics.items()}  # type: ignore[union-attr]
 
 
 # Singleton instance
@@ -1,19 +1,102 @@
 """Load document data into MongoDB."""
 
+import multiprocessing
+import os
 import random
+from itertools import chain
+from typing import Any
 
-from faker import Faker
+import numpy as np
+import pandas as pd
 from tqdm import tqdm
 
 from src.db.mongodb_client import mongo_client
 from src.utils.data_parser import DataParser
 
+# Documents per insert_many call; keeps each request well under the 16 MB BSON message limit
+INSERT_BATCH_SIZE = 10_000
+
+THEMES = ("light", "dark")
+LANGUAGES = ("en", "es", "fr")
+
+# Below this many products per worker, process start-up costs more than the parallel generation saves
+PARALLEL_REVIEWS_MIN_PRODUCTS = 2_000
+
+
+def _generate_reviews(
+    product_ids: list[str],
+    users: list[dict[str, Any]],
+    num_reviews_per_product: int,
+    seed: np.random.SeedSequence,
+    show_progress: bool = False,
+) -> list[dict]:
+    """Generate reviews for a slice of products; module-level so worker processes can run it."""
+    from faker import Faker
+
+    faker = Faker()
+    faker.seed_instance(int(seed.generate_state(1)[0]))
+    rng = np.random.default_rng(seed)
+
+    # Draw every per-review random value up front as NumPy vectors instead of one
+    # `random` call per field; .tolist() hands back native types that BSON can encode.
+    review_counts = rng.integers(1, num_reviews_per_product + 1, size=len(product_ids))
+    total = int(review_counts.sum())
+    review_product_ids = np.repeat(np.array(product_ids, dtype=object), review_counts).tolist()
+    authors = rng.integers(len(users), size=total).tolist()
+    ratings = rng.integers(3, 6, size=total).tolist()
+    helpful_votes = rng.integers(0, 51, size=total).tolist()
+    image_counts = rng.integers(0, 3, size=total).tolist()
+    verified = (rng.random(total) < 0.5).tolist()
+    comment_counts = np.where(rng.random(total) < 0.5, rng.integers(1, 3, size=total), 0).tolist()
+    commenters = rng.integers(len(users), size=(total, 2)).tolist()
+
+    reviews = []
+    for k in tqdm(range(total), disable=not show_progress):
+        user = users[authors[k]]
+        review_date = faker.date_time_between(start_date=user["join_date"])
+
+        comments = [
+            {
+                "user_id": commenter["id"],
+                "username": commenter["name"],
+                "content": faker.sentence(),
+                "created_at": faker.date_time_between(start_date=review_date),
+            }
+            for commenter in (users[index] for index in commenters[k][: comment_counts[k]])
+        ]
+
+        reviews.append(
+            {
+                "product_id": review_product_ids[k],
+                "user_id": user["id"],
+                "username": user["name"],
+                "rating": ratings[k],
+                "title": faker.sentence(nb_words=4),
+                "content": faker.paragraph(nb_sentences=2),
+                "images": [faker.image_url() for _ in range(image_counts[k])],
+                "helpful_votes": helpful_votes[k],
+                "verified_purchase": verified[k],
+                "created_at": review_date,
+                "comments": comments,
+            }
+        )
+    return reviews
+
 
 class DocumentLoader:
     def __init__(self):
         self.mongo = mongo_client
         self.parser = DataParser()
-        self.faker = Faker()
+        self._faker = None
+
+    @property
+    def faker(self):
+        """Faker instance, created on first use since importing it loads every locale provider."""
+        if self._faker is None:
+            from faker import Faker
+
+            self._faker = Faker()
+        return self._faker
 
     def load_all(self):
         """Load all document data into MongoDB."""
@@ -37,6 +120,12 @@ class DocumentLoader:
 
         print("Document data loading complete!")
 
+    def _insert_documents(self, collection_name: str, documents: list[dict]):
+        """Insert documents in chunks; unordered, so one failed document doesn't abort the rest of the chunk."""
+        collection = self.mongo.get_collection(collection_name)
+        for start in range(0, len(documents), INSERT_BATCH_SIZE):
+            collection.insert_many(documents[start : start + INSERT_BATCH_SIZE], ordered=False)
+
     def clear_collections(self):
         """Clear all relevant collections."""
         collections = ["user_preferences", "seller_profiles", "reviews", "product_specs"]
@@ -46,125 +135,151 @@ class DocumentLoader:
     def load_user_preferences(self):
         """Load user preferences."""
         users = self.parser.parse_users()
-        preferences = []
-        for _, user in users.iterrows():
-            preferences.append(
-                {
-                    "user_id": user["id"],
-                    "email": user["email"],
-                    "interests": user["interests"],
-                    "theme": random.choice(["light", "dark"]),
-                    "language": random.choice(["en", "es", "fr"]),
-                }
+        preferences = [
+            {"user_id": user_id, "email": email, "interests": interests, "theme": theme, "language": language}
+            for user_id, email, interests, theme, language in zip(
+                users["id"],
+                users["email"],
+                users["interests"],
+                random.choices(THEMES, k=len(users)),
+                random.choices(LANGUAGES, k=len(users)),
+                strict=True,
             )
+        ]
 
-        if preferences:
-            self.mongo.get_collection("user_preferences").insert_many(preferences)
+        self._insert_documents("user_preferences", preferences)
         print(f"Loaded {len(preferences)} user preferences.")
 
     def load_seller_profiles(self):
         """Generate and load rich seller profiles."""
         sellers = self.parser.parse_sellers()
-        profiles = []
-        for _, seller in sellers.iterrows():
-            profiles.append(
-                {
-                    "seller_id": seller["id"],
-                    "name": seller["name"],
-                    "profile_bio": self.faker.paragraph(nb_sentences=3),
-                    "portfolio_images": [self.faker.image_url() for _ in range(random.randint(2, 5))],
-                    "social_links": {
-                        "instagram": f"https://instagram.com/{self.faker.user_name()}",
-                        "website": self.faker.url(),
-                    },
-                }
-            )
+        profiles = [
+            {
+                "seller_id": seller_id,
+                "name": name,
+                "profile_bio": self.faker.paragraph(nb_sentences=3),
+                "portfolio_images": [self.faker.image_url() for _ in range(random.randint(2, 5))],
+                "social_links": {
+                    "instagram": f"https://instagram.com/{self.faker.user_name()}",
+                    "website": self.faker.url(),
+                },
+            }
+            for seller_id, name in zip(sellers["id"], sellers["name"], strict=True)
+        ]
 
-        if profiles:
-            self.mongo.get_collection("seller_profiles").insert_many(profiles)
+        self._insert_documents("seller_profiles", profiles)
         print(f"Loaded {len(profiles)} seller profiles.")
 
     def load_reviews(self, num_reviews_per_product: int = 3):
-        """Generate and load product reviews."""
-        products = self.parser.parse_products()
-        users = self.parser.parse_users()
-        reviews = []
-
-        for _, product in tqdm(products.iterrows(), total=len(products)):
-            for _ in range(random.randint(1, num_reviews_per_product)):
-                user = users.sample(1).iloc[0]
-                review_date = self.faker.date_time_between(start_date=user["join_date"])
-
-                has_comments = random.choice([True, False])
-                comments = []
-                if has_comments:
-                    for _ in range(random.randint(1, 2)):
-                        commenter = users.sample(1).iloc[0]
-                        comments.append(
-                            {
-                                "user_id": commenter["id"],
-                                "username": commenter["name"],
-                                "content": self.faker.sentence(),
-                                "created_at": self.faker.date_time_between(start_date=review_date),
-                            }
-                        )
+        """Generate and load product reviews, spreading large catalogues over worker processes."""
+        product_ids = self.parser.parse_products()["id"].tolist()
+        users = self.parser.parse_users()[["id", "name", "join_date"]].to_dict("records")
+        seed = np.random.SeedSequence()
+        workers = min(os.cpu_count() or 1, max(1, len(product_ids) // PARALLEL_REVIEWS_MIN_PRODUCTS))
 
-                reviews.append(
-                    {
-                        "product_id": product["id"],
-                        "user_id": user["id"],
-                        "username": user["name"],
-                        "rating": random.randint(3, 5),
-                        "title": self.faker.sentence(nb_words=4),
-                        "content": self.faker.paragraph(nb_sentences=2),
-                        "images": [self.faker.image_url() for _ in range(random.randint(0, 2))],
-                        "helpful_votes": random.randint(0, 50),
-                        "verified_purchase": random.choice([True, False]),
-                        "created_at": review_date,
-                        "comments": comments,
-                    }
+        if workers == 1:
+            reviews = _generate_reviews(product_ids, users, num_reviews_per_product, seed, show_progress=True)
+        else:
+            chunks = [chunk.tolist() for chunk in np.array_split(np.array(product_ids, dtype=object), workers)]
+            # spawn, not fork: the parent already holds open MongoDB connections
+            with multiprocessing.get_context("spawn").Pool(workers) as pool:
+                results = pool.starmap(
+                    _generate_reviews,
+                    [
+                        (chunk, users, num_reviews_per_product, chunk_seed)
+                        for chunk, chunk_seed in zip(chunks, seed.spawn(workers), strict=True)
+                    ],
                 )
-        if reviews:
-            self.mongo.get_collection("reviews").insert_many(reviews)
+            reviews = list(chain.from_iterable(results))
+
+        self._insert_documents("reviews", reviews)
         print(f"Generated and loaded {len(reviews)} reviews.")
 
     def load_product_specs(self):
         """Generate and load product specs."""
         products = self.parser.parse_products()
+        categories = products["category_id"]
+        rng = np.random.default_rng()
+
+        # Same precedence as an if/elif chain on the category name: each product gets at most one spec type
+        is_apparel = categories.str.contains("Apparel", regex=False, na=False)
+        is_kitchen = categories.str.contains("Home & Kitchen", regex=False, na=False) & ~is_apparel
+        is_jewelry = categories.str.contains("Jewelry", regex=False, na=False) & ~is_apparel & ~is_kitchen
+
         all_specs = []
 
-        for _, product in products.iterrows():
-            category_name = product["category_id"]
-            specs = {}
-            if not isinstance(category_name, str):
-                continue
-
-            if "Apparel" in category_name:
-                specs = {
-                    "material": random.choice(["Cotton", "Polyester", "Wool", "Silk"]),
-                    "sizes_available": random.sample(["S", "M", "L", "XL"], k=random.randint(1, 4)),
-                    "care_instructions": ["Machine wash cold", "Tumble dry low"],
-                }
-            elif "Home & Kitchen" in category_name:
-                specs = {
-                    "material": random.choice(["Ceramic", "Wood", "Stainless Steel"]),
-                    "dimensions": f"{random.randint(5, 50)}x{random.randint(5, 50)}x{random.randint(5, 50)} cm",
-                    "weight": f"{random.uniform(0.5, 5.0):.2f} kg",
-                }
-            elif "Jewelry" in category_name:
-                specs = {
-                    "material": random.choice(["Gold", "Silver", "Platinum"]),
-                    "gemstone": random.choice(["Diamond", "Ruby", "Sapphire", "None"]),
-                    "chain_length_inches": random.choice([16, 18, 20, 24]),
-                }
-
-            if specs:
-                all_specs.append({"product_id": product["id"], "category": category_name, "specs": specs})
-
-        if all_specs:
-            self.mongo.get_collection("product_specs").insert_many(all_specs)
+        apparel = products[is_apparel]
+        if not apparel.empty:
+            n = len(apparel)
+            # Each row is a shuffled copy of the sizes; keep a random-length prefix to sample without replacement
+            sizes = rng.permuted(np.tile(["S", "M", "L", "XL"], (n, 1)), axis=1).tolist()
+            size_counts = rng.integers(1, 5, size=n).tolist()
+            all_specs.extend(
+                self._spec_documents(
+                    apparel,
+                    [
+                        {
+                            "material": material,
+                            "sizes_available": row_sizes[:count],
+                            "care_instructions": ["Machine wash cold", "Tumble dry low"],
+                        }
+                        for material, row_sizes, count in zip(
+                            rng.choice(["Cotton", "Polyester", "Wool", "Silk"], size=n).tolist(),
+                            sizes,
+                            size_counts,
+                            strict=True,
+                        )
+                    ],
+                )
+            )
+
+        kitchen = products[is_kitchen]
+        if not kitchen.empty:
+            n = len(kitchen)
+            all_specs.extend(
+                self._spec_documents(
+                    kitchen,
+                    [
+                        {"material": material, "dimensions": f"{x}x{y}x{z} cm", "weight": f"{weight:.2f} kg"}
+                        for material, (x, y, z), weight in zip(
+                            rng.choice(["Ceramic", "Wood", "Stainless Steel"], size=n).tolist(),
+                            rng.integers(5, 51, size=(n, 3)).tolist(),
+                            rng.uniform(0.5, 5.0, size=n).tolist(),
+                            strict=True,
+                        )
+                    ],
+                )
+            )
+
+        jewelry = products[is_jewelry]
+        if not jewelry.empty:
+            n = len(jewelry)
+            all_specs.extend(
+                self._spec_documents(
+                    jewelry,
+                    [
+                        {"material": material, "gemstone": gemstone, "chain_length_inches": length}
+                        for material, gemstone, length in zip(
+                            rng.choice(["Gold", "Silver", "Platinum"], size=n).tolist(),
+                            rng.choice(["Diamond", "Ruby", "Sapphire", "None"], size=n).tolist(),
+                            rng.choice([16, 18, 20, 24], size=n).tolist(),
+                            strict=True,
+                        )
+                    ],
+                )
+            )
+
+        self._insert_documents("product_specs", all_specs)
         print(f"Generated and loaded {len(all_specs)} product specifications.")
 
+    @staticmethod
+    def _spec_documents(products: pd.DataFrame, specs: list[dict]) -> list[dict]:
+        """Pair each product row with its generated specs as a product_specs document."""
+        return [
+            {"product_id": product_id, "category": category, "specs": product_specs}
+            for product_id, category, product_specs in zip(products["id"], products["category_id"], specs, strict=True)
+        ]
+
 
 if __name__ == "__main__":
     loader = DocumentLoader()
@@ -1,10 +1,27 @@
 """Load graph data into Neo4j."""
+import asyncio
+from itertools import batched
+from typing import Any
+
+import numpy as np
+from neo4j import AsyncDriver, AsyncManagedTransaction
 from tqdm import tqdm
 
 from src.db.neo4j_client import neo4j_client
 from src.db.postgres_client import db as pg_db
 from src.utils.data_parser import DataParser
 
+WRITE_BATCH_SIZE = 1000
+# Batch transactions kept in flight at once by the async loaders
+WRITE_CONCURRENCY = 8
+# Rows of the similarity matrix computed per matmul, bounding memory to SIMILARITY_BLOCK_SIZE x N floats
+SIMILARITY_BLOCK_SIZE = 1024
+
+
+async def _run_batch(tx: AsyncManagedTransaction, query: str, rows: list[dict[str, Any]]):
+    result = await tx.run(query, rows=rows)
+    await result.consume()
+
 
 class GraphLoader:
     """Load graph data into Neo4j."""
@@ -14,6 +31,30 @@ class GraphLoader:
         self.client = neo4j_client
         self.parser = DataParser()
 
+    def _write_batches(self, query: str, rows: list[dict[str, Any]], desc: str):
+        """Run an `UNWIND $rows` query over `rows`, one write transaction per batch."""
+        with (
+            self.client.driver.session(database=self.client.database) as session,
+            tqdm(total=len(rows), desc=desc) as progress,
+        ):
+            for batch in batched(rows, WRITE_BATCH_SIZE):
+                session.execute_write(lambda tx, chunk=batch: tx.run(query, rows=list(chunk)).consume())
+                progress.update(len(batch))
+
+    async def _write_batches_async(self, driver: AsyncDriver, query: str, rows: list[dict[str, Any]], desc: str):
+        """Like `_write_batches`, but keeps up to WRITE_CONCURRENCY batch transactions in flight."""
+        semaphore = asyncio.Semaphore(WRITE_CONCURRENCY)
+
+        with tqdm(total=len(rows), desc=desc) as progress:
+
+            async def write(batch: list[dict[str, Any]]):
+                async with semaphore, driver.session(database=self.client.database) as session:
+                    # execute_write retries transient errors, e.g. lock deadlocks between concurrent MERGEs
+                    await session.execute_write(_run_batch, query, batch)
+                progress.update(len(batch))
+
+            await asyncio.gather(*(write(list(batch)) for batch in batched(rows, WRITE_BATCH_SIZE)))
+
     def load_all(self):
         """Load all graph data into Neo4j."""
         print("Creating constraints in Neo4j...")
@@ -47,100 +88,108 @@ class GraphLoader:
     def load_categories(self):
         """Load categories into Neo4j."""
         categories = self.parser.parse_categories()
-        with self.client.driver.session() as session:
-            for _, row in tqdm(categories.iterrows(), total=len(categories), desc="Loading Categories"):
-                session.run(
-                    "CREATE (c:Category {id: $id, name: $name})",
-                    id=row["id"],
-                    name=row["name"],
-                )
+        rows = categories[["id", "name"]].to_dict("records")
+        self._write_batches("UNWIND $rows AS r CREATE (c:Category {id: r.id, name: r.name})", rows, "Loading Categories")
         print(f"Loaded {len(categories)} categories.")
 
     def load_users(self):
         """Load users into Neo4j."""
         users = self.parser.parse_users()
-        with self.client.driver.session() as session:
-            for _, row in tqdm(users.iterrows(), total=len(users), desc="Loading Users"):
-                session.run(
-                    "CREATE (u:User {id: $id, name: $name, join_date: $join_date})",
-                    id=row["id"],
-                    name=row["name"],
-                    join_date=str(row["join_date"]),
-                )
+        rows = [
+            {"id": user_id, "name": name, "join_date": str(join_date)}
+            for user_id, name, join_date in zip(users["id"], users["name"], users["join_date"], strict=True)
+        ]
+        self._write_batches(
+            "UNWIND $rows AS r CREATE (u:User {id: r.id, name: r.name, join_date: r.join_date})",
+            rows,
+            "Loading Users",
+        )
         print(f"Loaded {len(users)} users.")
 
     def load_products_and_relationships(self):
         """Load products and their relationships to categories."""
         products = self.parser.parse_products()
         categories = self.parser.parse_categories()
-        category_map = categories.set_index("name")["id"].to_dict()
-        products["category_id_mapped"] = products["category_id"].replace(category_map)
-
-        with self.client.driver.session() as session:
-            for _, row in tqdm(products.iterrows(), total=len(products), desc="Loading Products"):
-                # Create Product node
-                session.run(
-                    """
-                    CREATE (p:Product {id: $id, name: $name, price: $price})
-                    """,
-                    id=row["id"],
-                    name=row["name"],
-                    price=row["price"],
-                )
-                # Create BELONGS_TO relationship
-                session.run(
-                    """
-                    MATCH (p:Product {id: $product_id})
-                    MATCH (c:Category {id: $category_id})
-                    MERGE (p)-[:BELONGS_TO]->(c)
-                    """,
-                    product_id=row["id"],
-                    category_id=row["category_id_mapped"],
-                )
+        category_map = dict(zip(categories["name"], categories["id"], strict=True))
+        # Unknown categories map to NaN, which matches no Category node, so those products get no edge
+        category_ids = products["category_id"].map(category_map)
+
+        rows = [
+            {"id": product_id, "name": name, "price": price, "category_id": category_id}
+            for product_id, name, price, category_id in zip(
+                products["id"], products["name"], products["price"].tolist(), category_ids, strict=True
+            )
+        ]
+        asyncio.run(self._load_products_async(rows))
         print(f"Loaded {len(products)} products and their category relationships.")
 
+    async def _load_products_async(self, rows: list[dict[str, Any]]):
+        """Write product nodes together with their category relationships, with concurrent batches."""
+        async with self.client.create_async_driver() as driver:
+            # One statement per batch creates the node and its edge; the MATCH after WITH only
+            # filters the edge, so products whose category is unknown are still created.
+            await self._write_batches_async(
+                driver,
+                """
+                UNWIND $rows AS r
+                CREATE (p:Product {id: r.id, name: r.name, price: r.price})
+                WITH p, r
+                MATCH (c:Category {id: r.category_id})
+                CREATE (p)-[:BELONGS_TO]->(c)
+                """,
+                rows,
+                "Loading Products",
+            )
+
     def load_similar_product_relationships(self, top_k: int = 5):
         """
         Create SIMILAR_TO relationships between products based on vector similarity.
 
-        This method fetches product embeddings from pgvector, and for each product,
-        finds the `top_k` most similar products, then writes the corresponding
-        `SIMILAR_TO` relationship into Neo4j with a `score`.
+        This method fetches all product embeddings from pgvector once, computes cosine
+        similarities in memory with NumPy, keeps the `top_k` most similar products for
+        each product, then writes the corresponding `SIMILAR_TO` relationships into
+        Neo4j with a `score`.
         """
         with pg_db.get_cursor() as cursor:
-            # Get all product IDs that have an embedding
-            cursor.execute("SELECT product_id FROM product_embeddings")
-            product_ids = [row["product_id"] for row in cursor.fetchall()]
-
-            # Use a single Neo4j session for all updates
-            with self.client.driver.session() as session:
-                for product_id in tqdm(product_ids, desc="Creating SIMILAR_TO relationships"):
-                    # Find top_k similar products for the current product
-                    cursor.execute(
-                        """
-                        SELECT B.product_id, 1 - (A.embedding <=> B.embedding) AS similarity
-                        FROM product_embeddings A, product_embeddings B
-                        WHERE A.product_id = %s AND A.product_id <> B.product_id
-                        ORDER BY similarity DESC
-                        LIMIT %s;
-                        """,
-                        (product_id, top_k),
-                    )
-                    similar_products = cursor.fetchall()
-
-                    # For each similar product, create the relationship in Neo4j
-                    for similar in similar_products:
-                        session.run(
-                            """
-                            MATCH (p1:Product {id: $p1_id})
-                            MATCH (p2:Product {id: $p2_id})
-                            MERGE (p1)-[r:SIMILAR_TO]->(p2)
-                            SET r.score = $score
-                            """,
-                            p1_id=product_id,
-                            p2_id=similar["product_id"],
-                            score=similar["similarity"],
-                        )
+            cursor.execute("SELECT product_id, embedding FROM product_embeddings")
+            rows = cursor.fetchall()
+
+        product_ids = [row["product_id"] for row in rows]
+        top_k = min(top_k, len(product_ids) - 1)
+        if top_k <= 0:
+            print("Not enough product embeddings to create SIMILAR_TO relationships.")
+            return
+
+        embeddings = np.stack([row["embedding"] for row in rows]).astype(np.float32, copy=False)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        embeddings /= np.where(norms == 0, 1, norms)
+
+        similar_rows = []
+        for start in tqdm(range(0, len(product_ids), SIMILARITY_BLOCK_SIZE), desc="Finding similar products"):
+            similarity = embeddings[start : start + SIMILARITY_BLOCK_SIZE] @ embeddings.T
+            block_rows = np.arange(similarity.shape[0])
+            # A product is always most similar to itself; exclude it from its own top-k
+            similarity[block_rows, block_rows + start] = -np.inf
+            top_indices = np.argpartition(-similarity, top_k - 1, axis=1)[:, :top_k]
+            top_scores = np.take_along_axis(similarity, top_indices, axis=1)
+            for offset, (indices, scores) in enumerate(zip(top_indices, top_scores, strict=True)):
+                product_id = product_ids[start + offset]
+                similar_rows.extend(
+                    {"p1_id": product_id, "p2_id": product_ids[index], "score": float(score)}
+                    for index, score in zip(indices, scores, strict=True)
+                )
+
+        self._write_batches(
+            """
+            UNWIND $rows AS r
+            MATCH (p1:Product {id: r.p1_id})
+            MATCH (p2:Product {id: r.p2_id})
+            MERGE (p1)-[s:SIMILAR_TO]->(p2)
+            SET s.score = r.score
+            """,
+            similar_rows,
+            "Creating SIMILAR_TO relationships",
+        )
         print(f"Created SIMILAR_TO relationships for {len(product_ids)} products.")
 
 
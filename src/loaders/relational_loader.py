@@ -1,70 +1,80 @@
 """Load data into PostgreSQL database."""
 
+import pandas as pd
+from psycopg2.extras import execute_values
+
 from src.db.postgres_client import db
 from src.utils.data_parser import DataParser
 
 
+def _pg_array_literal(values: list[str]) -> str:
+    """Format a list of strings as a quoted PostgreSQL array literal, e.g. {"a","b c"}."""
+    quoted = ('"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"' for value in values)
+    return "{" + ",".join(quoted) + "}"
+
+
 class RelationalLoader:
     def __init__(self):
         self.db = db
         self.parser = DataParser()
 
-    def load_categories(self):
-        """Load categories into PostgreSQL."""
+    def load_categories(self) -> pd.DataFrame:
+        """Load categories into PostgreSQL and return the parsed frame."""
         categories = self.parser.parse_categories()
 
+        records = list(categories[["id", "name", "description"]].itertuples(index=False, name=None))
+
         with self.db.get_cursor() as cursor:
-            for _, row in categories.iterrows():
-                query = """
-                        INSERT INTO categories (id, name, description)
-                        VALUES (%(id)s, %(name)s, %(description)s) ON CONFLICT (id) DO NOTHING; \
-                        """
-                cursor.execute(query, row.to_dict())
+            execute_values(
+                cursor,
+                "INSERT INTO categories (id, name, description) VALUES %s ON CONFLICT (id) DO NOTHING",
+                records,
+                page_size=1000,
+            )
 
         print(f"Loaded {len(categories)} categories")
+        return categories
 
     def load_sellers(self):
         """Load sellers into PostgreSQL."""
         sellers = self.parser.parse_sellers()
+        records = list(sellers[["id", "name", "rating", "joined"]].itertuples(index=False, name=None))
         with self.db.get_cursor() as cursor:
-            for _, row in sellers.iterrows():
-                query = """
-                    INSERT INTO sellers (id, name, rating, joined)
-                    VALUES (%(id)s, %(name)s, %(rating)s, %(joined)s) ON CONFLICT (id) DO NOTHING;
-                """
-                cursor.execute(query, row.to_dict())
+            execute_values(
+                cursor,
+                "INSERT INTO sellers (id, name, rating, joined) VALUES %s ON CONFLICT (id) DO NOTHING",
+                records,
+                page_size=1000,
+            )
         print(f"Loaded {len(sellers)} sellers")
 
     def load_users(self):
         """Load users into PostgreSQL."""
         users = self.parser.parse_users()
+        rows = users[["id", "name", "email", "join_date"]].assign(interests=users["interests"].map(_pg_array_literal))
         with self.db.get_cursor() as cursor:
-            for _, row in users.iterrows():
-                query = """
-                    INSERT INTO users (id, name, email, join_date, interests)
-                    VALUES (%(id)s, %(name)s, %(email)s, %(join_date)s, %(interests)s) ON CONFLICT (id) DO NOTHING;
-                """
-                cursor.execute(query, row.to_dict())
+            self.db.copy_rows(cursor, "users", rows)
         print(f"Loaded {len(users)} users")
 
-    def load_products(self):
-        """Load products into PostgreSQL."""
+    def load_products(self, categories: pd.DataFrame | None = None):
+        """Load products into PostgreSQL, reusing `categories` when the caller already parsed them."""
         products = self.parser.parse_products()
-        categories = self.parser.parse_categories()
+        if categories is None:
+            categories = self.parser.parse_categories()
 
         # Create a mapping from category name to category ID
-        category_map = categories.set_index("name")["id"].to_dict()
-        # Replace category names with IDs in the products dataframe
-        products["category_id"] = products["category_id"].replace(category_map)
-
+        category_map = dict(zip(categories["name"], categories["id"], strict=True))
+        # Replace category names with IDs (on a copy; parsed frames are shared)
+        category_ids = products["category_id"].map(category_map)
+        unknown = products.loc[category_ids.isna() & products["category_id"].notna(), "category_id"].unique()
+        if unknown.size:
+            raise ValueError(f"Products reference unknown categories: {', '.join(unknown)}")
+        products = products.assign(category_id=category_ids)
+
+        columns = ["id", "name", "description", "price", "category_id", "seller_id", "stock"]
+        rows = products[columns].assign(tags=products["tags"].map(_pg_array_literal))
         with self.db.get_cursor() as cursor:
-            for _, row in products.iterrows():
-                query = """
-                    INSERT INTO products (id, name, description, price, category_id, seller_id, tags, stock)
-                    VALUES (%(id)s, %(name)s, %(description)s, %(price)s, %(category_id)s, %(seller_id)s, %(tags)s, %(stock)s)
-                    ON CONFLICT (id) DO NOTHING;
-                """
-                cursor.execute(query, row.to_dict())
+            self.db.copy_rows(cursor, "products", rows)
         print(f"Loaded {len(products)} products")
 
     def load_all(self):
@@ -73,7 +83,7 @@ class RelationalLoader:
         self.db.create_tables()
 
         print("Loading categories...")
-        self.load_categories()
+        categories = self.load_categories()
 
         print("Loading sellers...")
         self.load_sellers()
@@ -82,7 +92,7 @@ class RelationalLoader:
         self.load_users()
 
         print("Loading products...")
-        self.load_products()
+        self.load_products(categories)
 
         print("Relational data loading complete!")
 
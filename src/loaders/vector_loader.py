@@ -1,43 +1,67 @@
 """Load vector embeddings into pgvector."""
 
+import os
+
 import numpy as np
+import torch
 from psycopg2.extras import execute_values
-from sentence_transformers import SentenceTransformer
-from tqdm import tqdm
 
 from src.db.postgres_client import db
+from src.db.redis_client import redis_client
 from src.utils.data_parser import DataParser
+from src.utils.embedding_model import load_embedding_model
+
+# Below this many texts, spawning encoder worker processes costs more than it saves
+MULTI_PROCESS_MIN_TEXTS = 20_000
 
 
 class VectorLoader:
     def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
-        self.model = SentenceTransformer(model_name)
+        # Bulk encoding is the only work in this process: give intra-op parallelism every core
+        torch.set_num_threads(os.cpu_count() or 1)
+        self.model = load_embedding_model(model_name)
         self.parser = DataParser()
         self.db = db
 
-    def load_embeddings(self, batch_size: int = 32):
+    def load_embeddings(self, batch_size: int = 64):
         """Generate and load embeddings for all product descriptions."""
         products = self.parser.parse_products()
         print(f"Generating embeddings for {len(products)} products...")
 
-        # Process in batches for efficiency
-        for i in tqdm(range(0, len(products), batch_size)):
-            batch = products.iloc[i : i + batch_size]
-
-            texts = (batch["name"] + " " + batch["description"] + " " + batch["tags"].apply(" ".join)).tolist()
+        texts = (products["name"] + " " + products["description"] + " " + products["tags"].str.join(" ")).tolist()
+        # One encode call over the whole catalogue: sentence-transformers sorts texts by length
+        # and pads per batch internally. Unit-length vectors make cosine distance a plain inner product.
+        if len(texts) >= MULTI_PROCESS_MIN_TEXTS:
+            embeddings = self._encode_multi_process(texts, batch_size)
+        else:
+            embeddings = self.model.encode(
+                texts,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=True,
+            )
 
-            product_ids = batch["id"].tolist()
-            embeddings = self.model.encode(texts, convert_to_numpy=True)
+        self._store_embeddings_batch(products["id"].tolist(), embeddings)
 
-            self._store_embeddings_batch(product_ids, embeddings)
+        # Cached semantic results were computed against the previous embeddings
+        deleted = redis_client.delete_pattern("semantic_search:*") + redis_client.delete_pattern("similar_products:*")
+        print(f"Embeddings loaded successfully. Invalidated {deleted} cached search results.")
 
-        print("Embeddings loaded successfully.")
+    def _encode_multi_process(self, texts: list[str], batch_size: int) -> np.ndarray:
+        """Encode large catalogues with one worker per GPU, or several CPU workers when there is none."""
+        pool = self.model.start_multi_process_pool()
+        try:
+            return self.model.encode_multi_process(texts, pool, batch_size=batch_size, normalize_embeddings=True)
+        finally:
+            self.model.stop_multi_process_pool(pool)
 
     def _store_embeddings_batch(self, product_ids: list[str], embeddings: np.ndarray):
         """Store a batch of embeddings in pgvector."""
 
         with self.db.get_cursor() as cursor:
-            data = [(pid, emb.tolist()) for pid, emb in zip(product_ids, embeddings, strict=False)]
+            # float32 rows go straight to pgvector's ndarray adapter; no boxed Python float lists
+            data = list(zip(product_ids, embeddings.astype(np.float32, copy=False), strict=True))
 
             execute_values(
                 cursor,
@@ -49,7 +73,7 @@ class VectorLoader:
                 """,
                 data,
                 template="(%s, %s)",
-                page_size=100,
+                page_size=1000,
             )
 
 
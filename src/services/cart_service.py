@@ -3,9 +3,13 @@
 import uuid
 from datetime import datetime
 
+from psycopg2.extras import execute_values
+
+from src.db.mongodb_client import mongo_client
 from src.db.neo4j_client import neo4j_client
 from src.db.postgres_client import db as postgres_db
 from src.db.redis_client import redis_client
+from src.services import product_service
 
 
 class CartService:
@@ -32,6 +36,37 @@ class CartService:
         print(f"Cart for user {user_id}: {cart}")
         return cart
 
+    @staticmethod
+    def get_cart_details(user_id: str) -> list[dict]:
+        """
+        Get a user's cart with product details and specifications resolved.
+        Products and specs are fetched with one batched query per store, not one per item,
+        and products already in the Redis product cache don't touch PostgreSQL at all.
+        """
+        cart = redis_client.get_cart(user_id)
+        product_ids = list(cart.keys())
+        products = product_service.get_products_by_ids(product_ids)
+        specs = mongo_client.get_specs_batch(product_ids)
+
+        items = []
+        for product_id, quantity in cart.items():
+            product = products.get(product_id)
+            if product is None:
+                print(f"Warning: Product '{product_id}' in cart for user '{user_id}' no longer exists. Skipping.")
+                continue
+            spec = specs.get(product_id)
+            items.append(
+                {
+                    "product_id": product_id,
+                    "name": product["name"],
+                    "price": product["price"],
+                    "quantity": quantity,
+                    "subtotal": round(product["price"] * quantity, 2),
+                    "specs": spec["specs"] if spec else None,
+                }
+            )
+        return items
+
     @staticmethod
     def update_item_quantity(user_id: str, product_id: str, quantity: int):
         """Update the quantity of a product in the cart."""
@@ -75,7 +110,7 @@ class CartService:
                 "SELECT id, price FROM products WHERE id = ANY(%s)",
                 (product_ids,),
             )
-            product_prices = {row["id"]: float(row["price"]) for row in cursor.fetchall()}
+            product_prices = {row["id"]: row["price"] for row in cursor.fetchall()}
 
             if len(product_prices) != len(product_ids):
                 raise ValueError("One or more products in the cart could not be found.")
@@ -94,14 +129,15 @@ class CartService:
             )
 
             # Bulk insert all order items
-            cursor.executemany(
-                "INSERT INTO order_items (order_id, product_id, quantity, price_at_purchase) VALUES (%s, %s, %s, %s)",
+            execute_values(
+                cursor,
+                "INSERT INTO order_items (order_id, product_id, quantity, price_at_purchase) VALUES %s",
                 order_items_to_insert,
+                page_size=100,
             )
 
         # After successful DB transaction, update other systems
-        for product_id, quantity in cart.items():
-            neo4j_client.add_purchase(user_id, product_id, quantity, order_date.isoformat())
+        neo4j_client.add_purchases(user_id, cart, order_date.isoformat())
 
         redis_client.clear_cart(user_id)
 
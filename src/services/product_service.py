@@ -8,33 +8,69 @@ from typing import Any
 
 from src.db.neo4j_client import neo4j_client
 from src.db.postgres_client import db
-from src.db.redis_client import redis_client
+from src.db.redis_client import HOT_PRODUCTS_KEY, redis_client
+
+
+def _product_cache_key(product_id: str) -> str:
+    return f"product:{product_id}"
+
+
+# Explicit list so the generated search_vec column never reaches the cache or API responses
+_PRODUCT_COLUMNS = "id, name, description, price, category_id, seller_id, tags, stock"
+
+# Hot on every product cache miss, so it runs as a per-connection prepared statement
+_PRODUCT_BY_ID_SQL = f"SELECT {_PRODUCT_COLUMNS} FROM products WHERE id = $1"
 
 
 def get_product_from_db(product_id: str) -> dict | None:
     """Fetch a single product directly from PostgreSQL."""
+    with db.get_cursor() as cursor:
+        db.execute_prepared(cursor, "get_product", _PRODUCT_BY_ID_SQL, (product_id,))
+        return cursor.fetchone()
+
+
+def get_products_from_db(product_ids: list[str]) -> dict[str, dict]:
+    """Fetch several products from PostgreSQL in a single query, keyed by product ID."""
+    if not product_ids:
+        return {}
     with db.get_cursor() as cursor:
         cursor.execute(
-            "SELECT * FROM products WHERE id = %s",
-            (product_id,),
+            f"SELECT {_PRODUCT_COLUMNS} FROM products WHERE id = ANY(%s)",
+            (product_ids,),
         )
-        product = cursor.fetchone()
-        if product and "price" in product:
-            product["price"] = float(product["price"])
-        return product
+        return {product["id"]: product for product in cursor.fetchall()}
 
 
-def get_product_by_id(product_id: str, user_id: str | None = None) -> dict | None:
+def get_products_by_ids(product_ids: list[str]) -> dict[str, dict]:
+    """
+    Get several products by ID, keyed by ID, using the same Redis cache as get_product_by_id.
+    Cached products come from one MGET; only the misses are fetched from PostgreSQL, in one query,
+    and written back to the cache in one pipeline.
+    """
+    cached_products = redis_client.get_json_many([_product_cache_key(pid) for pid in product_ids])
+    products = {pid: product for pid, product in zip(product_ids, cached_products, strict=True) if product}
+
+    missing_ids = [pid for pid in product_ids if pid not in products]
+    if missing_ids:
+        fetched = get_products_from_db(missing_ids)
+        redis_client.set_json_many({_product_cache_key(pid): product for pid, product in fetched.items()})
+        products.update(fetched)
+    return products
+
+
+def get_product_by_id(product_id: str, user_id: str | None = None) -> tuple[dict | None, bool]:
     """
     Get product by ID, using Redis as a cache.
     Also increments the product's view count for the 'hot products' list.
+    Returns the product (or None) and whether it was served from the cache.
     """
-    cache_key = f"product:{product_id}"
+    cache_key = _product_cache_key(product_id)
     start_time = time.monotonic()
 
-    # Check cache
-    cached_product = redis_client.get_json(cache_key)
-    if cached_product:
+    # Check cache; a hit also increments the 'hot products' score server-side
+    cached_product = redis_client.get_json_scoring_hot(cache_key, product_id)
+    cache_hit = cached_product is not None
+    if cache_hit:
         source = "CACHE"
         product = cached_product
     else:
@@ -44,14 +80,12 @@ def get_product_by_id(product_id: str, user_id: str | None = None) -> dict | Non
         if product:
             # Store in cache for future requests
             redis_client.set_json(cache_key, product)
+            redis_client.increment_hot_product_score(product_id)
 
     end_time = time.monotonic()
     duration = (end_time - start_time) * 1000  # in milliseconds
 
     if product:
-        # Increment score in the 'hot products' sorted set
-        redis_client.increment_hot_product_score(product_id)
-
         # Create the VIEWED relationship in Neo4j if a user_id is provided
         if user_id:
             neo4j_client.add_view(user_id, product_id)
@@ -60,7 +94,7 @@ def get_product_by_id(product_id: str, user_id: str | None = None) -> dict | Non
     else:
         print(f"Product {product_id} not found.")
 
-    return product
+    return product, cache_hit
 
 
 def search_products(
@@ -85,15 +119,13 @@ def search_products(
     ]
     cache_key = ":".join(cache_key_parts)
 
-    # 2. Check cache first
-    cached_results = redis_client.get_json(cache_key)
+    # 2. Check cache first; the hit/miss metric is recorded in the same round-trip
+    cached_results = redis_client.get_json_counted(cache_key, "hits", "misses")
     if cached_results is not None:
-        redis_client.increment_cache_metric("hits")
         print(f"Search results for query '{query}' found in CACHE.")
         return cached_results
 
     # 3. On cache miss, query the database
-    redis_client.increment_cache_metric("misses")
     print(f"Searching DATABASE for query '{query}'...")
 
     # Build the SQL query dynamically
@@ -103,10 +135,8 @@ def search_products(
     if query:
         # Use websearch_to_tsquery for flexible user input.
         # It handles multiple words, quotes, etc.
-        # We search across name, description, and tags.
-        sql_query += """
-            AND to_tsvector('english', name || ' ' || description || ' ' || array_to_string(tags, ' ')) @@ websearch_to_tsquery('english', %s)
-        """
+        # search_vec is the stored, GIN-indexed tsvector over name, description, and tags.
+        sql_query += " AND search_vec @@ websearch_to_tsquery('english', %s)"
         params.append(query)
 
     if category_id:
@@ -127,9 +157,8 @@ def search_products(
     results = []
     with db.get_cursor() as cursor:
         cursor.execute(sql_query, tuple(params))
-        rows = cursor.fetchall()
-        # Convert Decimal to float for JSON serialization
-        results = [{k: (float(v) if k == "price" else v) for k, v in row.items()} for row in rows]
+        # Prices already arrive as floats (see DEC2FLOAT in postgres_client)
+        results = [dict(row) for row in cursor.fetchall()]
 
     # 4. Store results in cache for future requests
     redis_client.set_json(cache_key, results)  # Uses default CACHE_TTL
@@ -175,6 +204,6 @@ if __name__ == "__main__":
     print(f"Cache Hits: {metrics['hits']}, Cache Misses: {metrics['misses']}")
 
     print("\nClearing temporary keys for next run...")
-    redis_client.client.delete("hot_products")
+    redis_client.client.delete(HOT_PRODUCTS_KEY)
     # A more robust approach would be to scan and delete search:* keys
     # For this example, we'll just let them expire.
@@ -1,31 +1,103 @@
 """Service for semantic product search using vector embeddings."""
 
 import hashlib
+from functools import lru_cache
 from typing import Any
 
 import numpy as np
-from sentence_transformers import SentenceTransformer
+import orjson
 
+from src.config import EMBEDDING_BACKEND, QUERY_EMBEDDING_CACHE_SIZE, SEARCH_CACHE_TTL
 from src.db.postgres_client import db as postgres_db
 from src.db.redis_client import redis_client
+from src.utils.embedding_model import load_embedding_model
+
+# Category names are joined only onto the final top-k rows, after the index has picked them,
+# instead of onto every candidate the scan visits.
+_TOP_MATCHES_SELECT = """
+    SELECT t.id, t.name, t.description, t.price, c.name as category_name, 1 - t.distance AS similarity
+    FROM top_matches t
+    LEFT JOIN categories c ON t.category_id = c.id
+    ORDER BY t.distance
+"""
+
+# Planned once per pooled connection via PREPARE; $1 is the source product, $2 the result count.
+# Ordering by the raw cosine distance (ascending) lets the HNSW index drive the scan;
+# sorting on the derived similarity would force an exact pass over every embedding.
+SIMILAR_PRODUCTS_SQL = (
+    """
+    WITH target_embedding AS (
+        SELECT embedding FROM product_embeddings WHERE product_id = $1
+    ),
+    top_matches AS (
+        SELECT
+            p.id, p.name, p.description, p.price, p.category_id,
+            pe.embedding <=> (SELECT embedding FROM target_embedding) AS distance
+        FROM product_embeddings pe
+        JOIN products p ON p.id = pe.product_id
+        WHERE pe.product_id != $1
+        ORDER BY pe.embedding <=> (SELECT embedding FROM target_embedding)
+        LIMIT $2
+    )
+"""
+    + _TOP_MATCHES_SELECT
+)
 
 
 class SemanticSearchService:
     """Encapsulates semantic search logic using pgvector and caching."""
 
     def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
-        self.model = SentenceTransformer(model_name)
-        print(f"SentenceTransformer model '{model_name}' loaded.")
+        self.model_name = model_name
+        self.backend = EMBEDDING_BACKEND
+        self.model = load_embedding_model(model_name, self.backend)
+        print(f"SentenceTransformer model '{model_name}' loaded ({self.backend} backend).")
+        # Per-instance LRU so filter-only variants of a query skip both the encoder and Redis
+        self._get_embedding = lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)(self._get_embedding)
+
+    @staticmethod
+    def _hash(data: bytes) -> str:
+        # Keys only need to be well distributed, not secure: 64-bit BLAKE2b is cheaper than SHA-1
+        return hashlib.blake2b(data, digest_size=8).hexdigest()
 
     def _generate_cache_key(self, params: dict) -> str:
-        sorted_params = sorted(params.items())
-        param_string = "&".join([f"{k}={v}" for k, v in sorted_params])
-        return f"semantic_search:{hashlib.md5(param_string.encode()).hexdigest()}"
+        return f"semantic_search:{self._hash(orjson.dumps(params, option=orjson.OPT_SORT_KEYS))}"
+
+    @staticmethod
+    def _rows_to_results(rows: list[dict]) -> list[dict]:
+        """Copy rows into plain dicts; price and similarity already arrive as floats."""
+        return [dict(row) for row in rows]
+
+    @staticmethod
+    def _filter_clauses(
+        category: str | None, min_price: float | None, max_price: float | None
+    ) -> tuple[str, list[Any]]:
+        """Build the optional product filters as ` AND ...` SQL (alias `p`) plus their parameters."""
+        sql = ""
+        params: list[Any] = []
+        if category:
+            sql += " AND p.category_id = (SELECT id FROM categories WHERE name = %s)"
+            params.append(category)
+        if min_price is not None:
+            sql += " AND p.price >= %s"
+            params.append(min_price)
+        if max_price is not None:
+            sql += " AND p.price <= %s"
+            params.append(max_price)
+        return sql, params
 
     def _get_embedding(self, text: str) -> np.ndarray:
-        embedding = self.model.encode(text)
-        if not isinstance(embedding, np.ndarray):
-            return np.array(embedding)
+        """Return the normalized float32 query vector; the array is shared by the LRU and read-only."""
+        # Embeddings depend only on the text, so filter-only variants of a query share one entry
+        cache_key = f"semantic_embedding:{self.model_name}:{self.backend}:{self._hash(text.encode())}"
+        cached_embedding = redis_client.get_bytes(cache_key)
+        if cached_embedding is not None:
+            return np.frombuffer(cached_embedding, dtype=np.float32)
+
+        encoded = self.model.encode(text, convert_to_numpy=True, normalize_embeddings=True)
+        embedding = np.asarray(encoded, dtype=np.float32)
+        embedding.flags.writeable = False
+        redis_client.set_bytes(cache_key, embedding.tobytes())
         return embedding
 
     def natural_language_search(
@@ -36,6 +108,8 @@ class SemanticSearchService:
         max_price: float | None = None,
         top_k: int = 10,
     ) -> list[dict]:
+        # MiniLM is uncased, so case and surrounding whitespace don't change the results
+        query = query.strip().lower()
         search_params = {
             "query": query,
             "category": category,
@@ -46,96 +120,66 @@ class SemanticSearchService:
         active_params = {k: v for k, v in search_params.items() if v is not None}
         cache_key = self._generate_cache_key(active_params)
 
-        cached_results = redis_client.get_json(cache_key)
+        cached_results = redis_client.get_json_counted(cache_key, "semantic_hits", "semantic_misses")
         if cached_results is not None:
-            redis_client.increment_cache_metric("semantic_hits")
             print(f"Semantic cache hit for key: {cache_key}")
             return cached_results
 
-        redis_client.increment_cache_metric("semantic_misses")
         print(f"Semantic cache miss for key: {cache_key}. Querying database.")
 
-        query_embedding = self._get_embedding(query)
-
-        sql = """
-            SELECT
-                p.id, p.name, p.description, p.price, c.name as category_name,
-                1 - (pe.embedding <=> %s) AS similarity
-            FROM products p
-            JOIN product_embeddings pe ON p.id = pe.product_id
-            LEFT JOIN categories c ON p.category_id = c.id
-            WHERE 1=1
-        """
-        sql_params: list[Any] = [query_embedding]
-
-        if category:
-            sql += " AND c.name = %s"
-            sql_params.append(category)
-        if min_price is not None:
-            sql += " AND p.price >= %s"
-            sql_params.append(min_price)
-        if max_price is not None:
-            sql += " AND p.price <= %s"
-            sql_params.append(max_price)
-
-        sql += " ORDER BY similarity DESC LIMIT %s;"
-        sql_params.append(top_k)
+        filter_sql, filter_params = self._filter_clauses(category, min_price, max_price)
+        if not query:
+            # Nothing to rank by: list the filtered products without running the encoder or touching embeddings
+            sql = f"""
+                SELECT p.id, p.name, p.description, p.price, c.name as category_name, NULL::float AS similarity
+                FROM products p
+                LEFT JOIN categories c ON p.category_id = c.id
+                WHERE 1=1 {filter_sql}
+                ORDER BY p.id
+                LIMIT %s
+            """
+            sql_params: list[Any] = [*filter_params, top_k]
+        else:
+            # The vector is bound once in a CTE; the scalar subquery makes it a plan-time constant,
+            # so ORDER BY on the raw distance can be served by the HNSW index
+            sql = f"""
+                WITH query_embedding AS (SELECT %s::vector AS embedding),
+                top_matches AS (
+                    SELECT
+                        p.id, p.name, p.description, p.price, p.category_id,
+                        pe.embedding <=> (SELECT embedding FROM query_embedding) AS distance
+                    FROM product_embeddings pe
+                    JOIN products p ON p.id = pe.product_id
+                    WHERE 1=1 {filter_sql}
+                    ORDER BY pe.embedding <=> (SELECT embedding FROM query_embedding)
+                    LIMIT %s
+                )
+            """
+            sql += _TOP_MATCHES_SELECT
+            sql_params = [self._get_embedding(query), *filter_params, top_k]
 
         with postgres_db.get_cursor() as cursor:
             cursor.execute(sql, tuple(sql_params))
-            results = [dict(row) for row in cursor.fetchall()]
-            for r in results:
-                if r.get("price"):
-                    r["price"] = float(r["price"])
-                if r.get("similarity"):
-                    r["similarity"] = float(r["similarity"])
+            results = self._rows_to_results(cursor.fetchall())
 
-        redis_client.set_json(cache_key, results)
+        redis_client.set_json(cache_key, results, ttl=SEARCH_CACHE_TTL)
         return results
 
     def find_similar_products(self, product_id: str, top_k: int = 5) -> list[dict]:
         cache_key = f"similar_products:{product_id}:{top_k}"
-        cached_results = redis_client.get_json(cache_key)
+        cached_results = redis_client.get_json_counted(cache_key, "similar_hits", "similar_misses")
         if cached_results is not None:
-            redis_client.increment_cache_metric("similar_hits")
             return cached_results
 
-        redis_client.increment_cache_metric("similar_misses")
-
-        sql = """
-            WITH target_embedding AS (
-                SELECT embedding FROM product_embeddings WHERE product_id = %s
-            )
-            SELECT
-                p.id, p.name, p.description, p.price, c.name as category_name,
-                1 - (pe.embedding <=> (SELECT embedding FROM target_embedding)) AS similarity
-            FROM products p
-            JOIN product_embeddings pe ON p.id = pe.product_id
-            LEFT JOIN categories c ON p.category_id = c.id
-            WHERE p.id != %s
-            ORDER BY similarity DESC
-            LIMIT %s;
-        """
-
         with postgres_db.get_cursor() as cursor:
-            cursor.execute(sql, (product_id, product_id, top_k))
-            results = [dict(row) for row in cursor.fetchall()]
-            for r in results:
-                if r.get("price"):
-                    r["price"] = float(r["price"])
-                if r.get("similarity"):
-                    r["similarity"] = float(r["similarity"])
+            postgres_db.execute_prepared(cursor, "similar_products", SIMILAR_PRODUCTS_SQL, (product_id, top_k))
+            results = self._rows_to_results(cursor.fetchall())
 
         redis_client.set_json(cache_key, results)
         return results
 
     def get_cache_stats(self) -> dict[str, int]:
-        stats = redis_client.client.keys("cache_metrics:*")
-        metrics = {}
-        for key in stats:
-            metric_name = key.split(":")[1]
-            value = redis_client.client.get(key)
-            metrics[metric_name] = int(value) if value else 0
+        metrics = redis_client.get_cache_metrics()
         print(f"Cache stats: {metrics}")
         return metrics
 
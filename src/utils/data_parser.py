@@ -1,37 +1,113 @@
 """Utilities for parsing CSV data."""
 
-from typing import override
+import os
+from collections.abc import Callable
+from functools import wraps
+from pathlib import Path
+from threading import Lock
+from typing import Any, override
 
 import pandas as pd
 
-from src.config import DATA_DIR
+from src.config import DATA_DIR, PARSED_DATA_CACHE_DIR
+
+# Bump whenever a parse_* method changes what it returns, so stale pickles are re-parsed
+PARSER_VERSION = 2
+
+# Parsed frames kept in memory, with the source-file key they were parsed from
+_frames: dict[str, tuple[tuple[int, str, int, int], pd.DataFrame]] = {}
+_frames_lock = Lock()
+
+
+def _read_cache(path: Path) -> Any:
+    """Load a cache pickle, or None if it is missing or can't be unpickled."""
+    if not path.exists():
+        return None
+    try:
+        return pd.read_pickle(path)
+    except Exception as e:
+        print(f"Discarding unreadable parse cache {path}: {e}")
+        path.unlink(missing_ok=True)
+        return None
+
+
+def _cached(name: str) -> Callable[[Callable[[], pd.DataFrame]], Callable[[], pd.DataFrame]]:
+    """
+    Reuse a parse result while `{name}.csv` is unchanged.
+
+    The key is PARSER_VERSION plus the file's (path, mtime_ns, size), so one stat() decides whether
+    the in-memory frame, then the pickle in PARSED_DATA_CACHE_DIR, is still valid; editing the CSV
+    or bumping the version invalidates both. Pickles keep list columns and datetimes typed, so a
+    warm start skips CSV tokenizing, splitting and date parsing altogether. An unreadable pickle
+    (truncated, or written by another pandas version) is deleted and the CSV parsed again.
+    """
+
+    def decorator(parse: Callable[[], pd.DataFrame]) -> Callable[[], pd.DataFrame]:
+        @wraps(parse)
+        def wrapper() -> pd.DataFrame:
+            source = DATA_DIR / f"{name}.csv"
+            stat = source.stat()
+            key = (PARSER_VERSION, str(source), stat.st_mtime_ns, stat.st_size)
+
+            with _frames_lock:
+                entry = _frames.get(name)
+                if entry and entry[0] == key:
+                    return entry[1]
+
+                cached = PARSED_DATA_CACHE_DIR / f"{name}.pkl"
+                stored = _read_cache(cached)
+                if isinstance(stored, tuple) and stored[0] == key:
+                    df = stored[1]
+                else:
+                    df = parse()
+                    PARSED_DATA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                    # Write then rename, so concurrent loaders never read a half-written file
+                    partial = cached.with_suffix(f".{os.getpid()}.tmp")
+                    pd.to_pickle((key, df), partial)
+                    os.replace(partial, cached)
+
+                _frames[name] = (key, df)
+                return df
+
+        return wrapper
+
+    return decorator
 
 
 class DataParser:
+    """
+    Parse the raw CSV files into DataFrames.
+
+    Each file is parsed once and the same DataFrame is handed to every caller until the CSV
+    changes, so treat the results as read-only (use `assign`/`copy` to derive modified frames).
+    Parsed frames are also pickled to PARSED_DATA_CACHE_DIR, so later processes skip parsing too.
+    """
+
     @staticmethod
+    @_cached("products")
     def parse_products() -> pd.DataFrame:
         """Parse products CSV file."""
-        df = pd.read_csv(DATA_DIR / "products.csv")
+        # Declared dtypes skip type inference and a follow-up astype pass
+        df = pd.read_csv(DATA_DIR / "products.csv", dtype={"PRICE": "float64", "STOCK": "int64"})
         df.columns = df.columns.str.lower()
         df = df.rename(columns={"category": "category_id"})
-        # Convert price to float
-        df["price"] = df["price"].astype(float)
         # Convert tags to list
-        df["tags"] = df["tags"].apply(lambda x: x.split(","))
+        df["tags"] = df["tags"].str.split(",")
         return df
 
     @staticmethod
+    @_cached("users")
     def parse_users() -> pd.DataFrame:
         """Parse users CSV file."""
-        df = pd.read_csv(DATA_DIR / "users.csv")
+        # Dates are parsed during tokenizing with a fixed format, so pandas never has to guess per value
+        df = pd.read_csv(DATA_DIR / "users.csv", parse_dates=["JOIN_DATE"], date_format="%Y-%m-%d")
         df.columns = df.columns.str.lower()
         # Convert interests to list
-        df["interests"] = df["interests"].apply(lambda x: x.split(","))
-        # Convert join_date to datetime
-        df["join_date"] = pd.to_datetime(df["join_date"])
+        df["interests"] = df["interests"].str.split(",")
         return df
 
     @staticmethod
+    @_cached("categories")
     def parse_categories() -> pd.DataFrame:
         """Parse categories CSV file."""
         df = pd.read_csv(DATA_DIR / "categories.csv")
@@ -39,39 +115,47 @@ class DataParser:
         return df
 
     @staticmethod
+    @_cached("sellers")
     def parse_sellers() -> pd.DataFrame:
         """Parse sellers CSV file."""
-        df = pd.read_csv(DATA_DIR / "sellers.csv")
+        df = pd.read_csv(
+            DATA_DIR / "sellers.csv", dtype={"RATING": "float64"}, parse_dates=["JOINED"], date_format="%Y-%m-%d"
+        )
         df.columns = df.columns.str.lower()
-        df["rating"] = df["rating"].astype(float)
-        df["joined"] = pd.to_datetime(df["joined"])
         return df
 
 
+_PARSERS: dict[str, Callable[[], pd.DataFrame]] = {
+    "products": DataParser.parse_products,
+    "users": DataParser.parse_users,
+    "categories": DataParser.parse_categories,
+    "sellers": DataParser.parse_sellers,
+}
+
+
+def _parse(data_type: str) -> pd.DataFrame:
+    """Dispatch to the process-wide, file-keyed cache behind the DataParser methods."""
+    return _PARSERS[data_type]()
+
+
 class CachedDataParser(DataParser):
-    """Data parser with caching capability."""
+    """
+    Data parser with caching capability.
 
-    def __init__(self):
-        self._cache: dict[str, pd.DataFrame] = {}
+    The cache is process-wide, so new instances never re-parse an unchanged file; returned
+    frames are shared and must be treated as read-only.
+    """
 
     @override
     def parse_products(self) -> pd.DataFrame:
         """Parse products with caching."""
-        if "products" not in self._cache:
-            self._cache["products"] = super().parse_products()
-        return self._cache["products"]
+        return _parse("products")
 
     # Python 3.12+ allows better pattern matching
     def get_data(self, data_type: str) -> pd.DataFrame:
         """Get data by type using pattern matching."""
         match data_type:
-            case "products":
-                return self.parse_products()
-            case "users":
-                return self.parse_users()
-            case "categories":
-                return self.parse_categories()
-            case "sellers":
-                return self.parse_sellers()
+            case "products" | "users" | "categories" | "sellers":
+                return _parse(data_type)
             case _:
                 raise ValueError(f"Unknown data type: {data_type}")
@@ -0,0 +1,42 @@
+"""In-process memoization helpers."""
+
+import time
+from collections.abc import Callable, Hashable
+from functools import wraps
+from threading import Lock
+from typing import Any
+
+
+def ttl_memo(ttl: float) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    Cache a function's result per positional arguments for `ttl` seconds.
+
+    Meant for data that is cheap to serve slightly stale, such as leaderboards.
+    Concurrent callers that miss wait for a single refresh instead of all
+    hitting the backing store at once.
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        entries: dict[tuple[Hashable, ...], tuple[float, Any]] = {}
+        lock = Lock()
+
+        def fresh(args: tuple[Hashable, ...]) -> tuple[float, Any] | None:
+            entry = entries.get(args)
+            if entry and time.monotonic() - entry[0] < ttl:
+                return entry
+            return None
+
+        @wraps(func)
+        def wrapper(*args: Hashable) -> Any:
+            if entry := fresh(args):
+                return entry[1]
+            with lock:
+                if entry := fresh(args):
+                    return entry[1]
+                value = func(*args)
+                entries[args] = (time.monotonic(), value)
+                return value
+
+        return wrapper
+
+    return decorator
@@ -1,140 +1,238 @@
 """Generate random purchase history."""
 
-import random
-import uuid
-from datetime import datetime, timedelta
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import batched
 
+import numpy as np
 import pandas as pd
+from psycopg2.extras import execute_values
 from tqdm import tqdm
 
 from src.db.neo4j_client import neo4j_client
 from src.db.postgres_client import db
 from src.utils.data_parser import DataParser
 
+ORDER_STATUSES = np.array(["shipped", "delivered", "pending", "cancelled"], dtype=object)
+NEO4J_BATCH_SIZE = 5000
+
+_HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+
+
+def _uuid4_strings(count: int) -> np.ndarray:
+    """Random version-4 UUIDs formatted like str(uuid.uuid4()), built as one byte array instead of per call."""
+    raw = np.frombuffer(os.urandom(16 * count), dtype=np.uint8).reshape(count, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
+    digits = _HEX_DIGITS[np.stack([raw >> 4, raw & 0x0F], axis=2).reshape(count, 32)]
+    chars = np.insert(digits, [8, 12, 16, 20], ord("-"), axis=1)
+    return chars.view("S36").ravel().astype(str).astype(object)
+
+
+@dataclass(frozen=True, slots=True)
+class PurchaseBatch:
+    """
+    Generated purchases as parallel NumPy columns.
+
+    Order-level arrays have one entry per order; line-level arrays have one entry per line
+    item, and `line_order` maps each line to its order's position. Statuses are kept as
+    uint8 codes into ORDER_STATUSES.
+    """
+
+    order_ids: np.ndarray
+    user_ids: np.ndarray
+    order_dates: np.ndarray
+    status_codes: np.ndarray
+    total_prices: np.ndarray
+    line_order: np.ndarray
+    product_ids: np.ndarray
+    quantities: np.ndarray
+    prices: np.ndarray
+
+    def __len__(self) -> int:
+        """Number of line items."""
+        return len(self.line_order)
+
+    @property
+    def num_orders(self) -> int:
+        return len(self.order_ids)
+
+    @property
+    def statuses(self) -> np.ndarray:
+        return ORDER_STATUSES[self.status_codes]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        One row per line item with its order's fields repeated, e.g. for inspection in a REPL.
+
+        Low-cardinality columns are categorical: a small code array per column instead of a
+        str per row, which also lets groupby on them skip hashing.
+        """
+        line_order = self.line_order
+        return pd.DataFrame(
+            {
+                "order_id": self.order_ids[line_order],
+                "user_id": pd.Categorical(self.user_ids[line_order]),
+                "product_id": pd.Categorical(self.product_ids),
+                "quantity": self.quantities,
+                "price_at_purchase": self.prices,
+                "order_date": self.order_dates[line_order],
+                "status": pd.Categorical.from_codes(self.status_codes[line_order], categories=ORDER_STATUSES),
+                "total_price": self.total_prices[line_order],
+            }
+        )
+
 
 class PurchaseGenerator:
     def __init__(self):
         self.parser = DataParser()
         self.users = self.parser.parse_users()
         self.products = self.parser.parse_products()
-
-        # Pre-process for faster lookups
-        self.products["tags_set"] = self.products["tags"].apply(set)
-
-    def generate_purchases(self, num_purchases: int = 100) -> pd.DataFrame:
+        self.rng = np.random.default_rng()
+
+        # Inverted index: each tag maps to the sorted positions of the products carrying it,
+        # so a user's candidates come from their few interests instead of a scan over every product
+        tag_to_products: dict[str, list[int]] = {}
+        for i, tags in enumerate(self.products["tags"]):
+            for tag in tags:
+                tag_to_products.setdefault(tag, []).append(i)
+        self.tag_to_products = {tag: np.array(idx, dtype=np.int32) for tag, idx in tag_to_products.items()}
+
+        # Sampling state for products: plain arrays indexed by position, built once per generator
+        self.product_ids = self.products["id"].to_numpy()
+        self.product_prices = self.products["price"].to_numpy()
+        self.candidates, self.candidate_offsets, self.candidate_counts = self._user_candidates()
+
+        # Per-user arrays indexed by position; join dates at second resolution, so order dates
+        # are plain integer offsets from them
+        self.user_ids = self.users["id"].to_numpy()
+        self.user_join_dates = self.users["join_date"].to_numpy(dtype="datetime64[s]")
+
+    def _user_candidates(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Flatten each user's purchasable products into one index array.
+
+        Returns (candidates, offsets, counts): user u may buy products
+        candidates[offsets[u]:offsets[u] + counts[u]]. Users whose interests match no
+        product tag fall back to the whole catalogue.
+        """
+        all_products = np.arange(len(self.products), dtype=np.int32)
+        per_user = []
+        for interests in self.users["interests"]:
+            matches = [self.tag_to_products[tag] for tag in interests if tag in self.tag_to_products]
+            per_user.append(np.unique(np.concatenate(matches)) if matches else all_products)  # Fallback to any product
+
+        counts = np.array([len(candidates) for candidates in per_user])
+        offsets = np.cumsum(counts) - counts
+        return np.concatenate(per_user), offsets, counts
+
+    def generate_purchases(self, num_purchases: int = 100) -> PurchaseBatch:
         """Generate random purchases based on user interests."""
-        purchases = []
-        users = self.users
-        products = self.products
-
-        for _ in range(num_purchases):
-            user = users.sample(1).iloc[0]
-            user_interests_set = set(user["interests"])
-
-            # Find products matching user interests
-            relevant_products = products[[not x.isdisjoint(user_interests_set) for x in products["tags_set"]]]
-
-            if relevant_products.empty:
-                relevant_products = products  # Fallback to any product
-
-            num_items = random.randint(1, 3)
-            order_products = relevant_products.sample(n=num_items, replace=True)
-
-            join_date = user["join_date"]
-            now = datetime.now()
-
-            # Ensure order date is after join date
-            order_date = join_date + timedelta(seconds=random.randint(0, int((now - join_date).total_seconds())))
-
-            order_id = str(uuid.uuid4())
-            status = random.choice(["shipped", "delivered", "pending", "cancelled"])
-
-            for _, product in order_products.iterrows():
-                purchases.append(
-                    {
-                        "order_id": order_id,
-                        "user_id": user["id"],
-                        "product_id": product["id"],
-                        "quantity": random.randint(1, 3),
-                        "price_at_purchase": product["price"],
-                        "order_date": order_date,
-                        "status": status,
-                    }
-                )
-
-        purchases_df = pd.DataFrame(purchases)
-
-        # Calculate total price per order and merge it back
-        order_totals = purchases_df.groupby("order_id")[["price_at_purchase", "quantity"]].apply(
-            lambda r: (r["price_at_purchase"] * r["quantity"]).sum()
+        rng = self.rng
+
+        # Order-level draws, all at once
+        user_idx = rng.integers(len(self.user_ids), size=num_purchases)
+        num_items = rng.integers(1, 4, size=num_purchases)
+        status_codes = rng.integers(len(ORDER_STATUSES), size=num_purchases, dtype=np.uint8)
+        order_ids = _uuid4_strings(num_purchases)
+
+        # Ensure order date is after join date
+        join_dates = self.user_join_dates[user_idx]
+        now = np.datetime64(datetime.now(), "s")
+        seconds_after_join = rng.integers(0, (now - join_dates).astype(np.int64) + 1)
+        order_dates = join_dates + seconds_after_join.astype("timedelta64[s]")
+
+        # Expand to line items: each line picks uniformly among its user's candidate products
+        line_order = np.repeat(np.arange(num_purchases), num_items)
+        line_user = user_idx[line_order]
+        picks = self.candidate_offsets[line_user] + rng.integers(self.candidate_counts[line_user])
+        line_product = self.candidates[picks]
+        quantities = rng.integers(1, 4, size=line_order.size)
+        prices = self.product_prices[line_product]
+
+        # Order totals: one vectorized multiply, then a weighted bincount over each line's order
+        total_prices = np.bincount(line_order, weights=prices * quantities, minlength=num_purchases)
+
+        return PurchaseBatch(
+            order_ids=order_ids,
+            user_ids=self.user_ids[user_idx],
+            order_dates=order_dates,
+            status_codes=status_codes,
+            total_prices=total_prices,
+            line_order=line_order,
+            product_ids=self.product_ids[line_product],
+            quantities=quantities,
+            prices=prices,
         )
-        order_totals.name = "total_price"
-        purchases_df = purchases_df.merge(order_totals, on="order_id")
-
-        return purchases_df
 
-    def load_into_postgres(self, purchases_df: pd.DataFrame):
+    def load_into_postgres(self, purchases: PurchaseBatch):
         """Load purchases into PostgreSQL."""
-        if purchases_df.empty:
+        if not len(purchases):
             print("No purchases to load into PostgreSQL.")
             return
 
-        orders_df = purchases_df[["order_id", "user_id", "order_date", "status", "total_price"]]
-        assert isinstance(orders_df, pd.DataFrame)
-        orders = orders_df.drop_duplicates(subset="order_id")
-
-        order_items = purchases_df[["order_id", "product_id", "quantity", "price_at_purchase"]]
+        # .tolist() yields native str/float/datetime values that psycopg2 can adapt
+        orders = list(
+            zip(
+                purchases.order_ids.tolist(),
+                purchases.user_ids.tolist(),
+                purchases.order_dates.tolist(),
+                purchases.statuses.tolist(),
+                purchases.total_prices.tolist(),
+                strict=True,
+            )
+        )
+        order_items = pd.DataFrame(
+            {
+                "order_id": purchases.order_ids[purchases.line_order],
+                "product_id": purchases.product_ids,
+                "quantity": purchases.quantities,
+                "price_at_purchase": purchases.prices,
+            }
+        )
 
+        # get_cursor already runs both loads as one transaction. Generated fixtures can be
+        # regenerated, so skip waiting for the WAL flush on commit (this transaction only)
         with db.get_cursor() as cursor:
+            cursor.execute("SET LOCAL synchronous_commit = off")
             # Load Orders
-            for _, order in orders.iterrows():
-                cursor.execute(
-                    """
-                    INSERT INTO orders (id, user_id, order_date, status, total_price)
-                    VALUES (%s, %s, %s, %s, %s) ON CONFLICT (id) DO NOTHING;
-                    """,
-                    (
-                        order["order_id"],
-                        order["user_id"],
-                        order["order_date"],
-                        order["status"],
-                        order["total_price"],
-                    ),
-                )
-            # Load Order Items
-            for _, item in order_items.iterrows():
-                cursor.execute(
-                    """
-                    INSERT INTO order_items (order_id, product_id, quantity, price_at_purchase)
-                    VALUES (%s, %s, %s, %s) ON CONFLICT (order_id, product_id) DO NOTHING;
-                    """,
-                    (
-                        item["order_id"],
-                        item["product_id"],
-                        item["quantity"],
-                        item["price_at_purchase"],
-                    ),
-                )
+            execute_values(
+                cursor,
+                """
+                INSERT INTO orders (id, user_id, order_date, status, total_price)
+                VALUES %s ON CONFLICT (id) DO NOTHING;
+                """,
+                orders,
+                page_size=1000,
+            )
+            # Load Order Items; they dwarf the orders in large runs, so stream them with COPY
+            db.copy_rows(cursor, "order_items", order_items, conflict_columns="order_id, product_id")
         print(f"Loaded {len(orders)} orders and {len(order_items)} order items into PostgreSQL.")
 
-    def load_into_neo4j(self, purchases_df: pd.DataFrame):
+    def load_into_neo4j(self, purchases: PurchaseBatch):
         """Load purchases into Neo4j."""
-        if purchases_df.empty:
+        if not len(purchases):
             print("No purchases to load into Neo4j.")
             return
 
-        # Use a minimal DataFrame for Neo4j to avoid type issues
-        neo4j_df = purchases_df[["user_id", "product_id", "quantity", "order_date"]]
-        assert isinstance(neo4j_df, pd.DataFrame)
-        neo4j_data = neo4j_df.to_dict("records")
-
-        for purchase in tqdm(neo4j_data, desc="Loading Purchases into Neo4j"):
-            neo4j_client.add_purchase(
-                user_id=str(purchase["user_id"]),
-                product_id=str(purchase["product_id"]),
-                quantity=int(purchase["quantity"]),
-                date=purchase["order_date"],
+        # Native Python values per row; the driver can't encode NumPy scalars
+        line_order = purchases.line_order
+        neo4j_data = [
+            {"user_id": user_id, "product_id": product_id, "quantity": quantity, "date": order_date}
+            for user_id, product_id, quantity, order_date in zip(
+                purchases.user_ids[line_order].tolist(),
+                purchases.product_ids.tolist(),
+                purchases.quantities.tolist(),
+                purchases.order_dates[line_order].tolist(),
+                strict=True,
             )
+        ]
+
+        # One UNWIND round-trip per batch instead of one per purchase
+        batches = list(batched(neo4j_data, NEO4J_BATCH_SIZE))
+        for batch in tqdm(batches, desc="Loading Purchases into Neo4j"):
+            neo4j_client.add_purchase_rows(list(batch))
         print(f"Loaded {len(neo4j_data)} purchase relationships into Neo4j.")
 
 